@@ -6,18 +6,27 @@ from OpenSimula.Variable import Variable
 
 class Component(Parameter_container):
     """Base Class for all the components"""
+    # Variable values in the project Variable_store
+    store_variables = True
+    # Time step hooks with nothing to do when the component is pre_calculated
+    pre_calculated_hooks = []
 
     def __init__(self, name, proj):
         Parameter_container.__init__(self, proj._sim_)
         self._variables_ = {}
+        self._project_ = proj
+        self.pre_calculated = False
+        self._copy_plan_ = None
         self.add_parameter(Parameter_string("type", "Component"))
         self.parameter("name").value = name
         self.parameter("description").value = "Description of the component"
-        self._project_ = proj
 
     def project(self):
         return self._project_
 
+    def _name_changed_(self):
+        self._project_._invalidate_components_index_()
+
     def simulation(self):
         return self._sim_
 
@@ -29,6 +38,7 @@ class Component(Parameter_container):
         variable.parent = self
         variable._sim_ = self._sim_
         self._variables_[variable.key] = variable
+        self._sim_._references_changed_()
 
     def del_variable(self, variable):
         self._variables_.remove(variable)
@@ -53,6 +63,8 @@ class Component(Parameter_container):
         series = {}
         series["date"] = self.project().dates()
         for key, var in self._variables_.items():
+            if not var.stored:  # Not selected as output
+                continue
             if var.unit == "":
                 series[key] = var.values
             else:
@@ -139,23 +151,83 @@ class Component(Parameter_container):
         # Initilise all variables to 0
         for key, var in self._variables_.items():
             var.initialise(n_time_steps)
+        self.pre_calculated = False
+        self._copy_plan_ = None
+
+    def pre_calculation(self, dates, daylight_saving):
+        """Calculate for all the time steps the variables that do not depend on the simulation state.
+        Components that calculate them must set pre_calculated to True
+
+        Args:
+            dates (datetime array): dates of all the time steps
+            daylight_saving (boolean array): daylight saving of all the time steps
+        """
+        pass
 
     def post_simulation(self):
         pass
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        # Initilise all variables to 0
+    def implements(self, hook):
+        """Check if the component does something in a time step hook, the project only calls
+        the hooks implemented
+
+        Args:
+            hook (string): "pre_iteration", "iteration" or "post_iteration"
+
+        Returns:
+            boolean: True if the component class overrides the hook, and it is not one of the
+            pre_calculated_hooks of a pre_calculated component (or it has variable parameters
+            to copy in pre_iteration)
+        """
+        if hook == "pre_iteration":
+            if self._copy_plan_ is None:
+                if self._has_variable_parameters_():
+                    return True
+            elif len(self._copy_plan_) > 0:
+                return True
+        if self.pre_calculated and hook in self.pre_calculated_hooks:
+            return False
+        return getattr(type(self), hook) is not getattr(Component, hook)
+
+    def _has_variable_parameters_(self):
+        for key, value in self.parameter_dict().items():
+            if value.type == "Parameter_variable" or value.type == "Parameter_variable_list":
+                return True
+        return False
+
+    def _linked_variables_(self):
+        # (source variable, local variable) of the variable parameters
+        links = []
         for key, value in self.parameter_dict().items():
-            # Copy variables in paramater_variable
             if value.type == "Parameter_variable":
                 if value.variable is not None:
-                    self.variable(
-                        value.symbol).values[time_index] = value.variable.values[time_index]
-            if value.type == "Parameter_variable_list":
+                    links.append(
+                        (value.variable, self.variable(value.symbol)))
+            elif value.type == "Parameter_variable_list":
                 for i in range(len(value.variable)):
                     if value.variable[i] is not None:
-                        self.variable(
-                            value.symbol[i]).values[time_index] = value.variable[i].values[time_index]
+                        links.append(
+                            (value.variable[i], self.variable(value.symbol[i])))
+        return links
+
+    def _create_copy_plan_(self):
+        """Copy the values of the variable parameters calculated before the time loop and
+        create the list of (source values, local values) arrays to copy in each pre_iteration"""
+        self._copy_plan_ = []
+        for source, local in self._linked_variables_():
+            if source.pre_calculated and source.parent.pre_calculated and local.stored:
+                local.values = source.values
+            else:
+                self._copy_plan_.append((source.values, local.values))
+
+    def pre_iteration(self, time_index, date, daylight_saving):
+        # Copy variables in paramater_variable
+        if self._copy_plan_ is None:
+            for source, local in self._linked_variables_():
+                local.values[time_index] = source.values[time_index]
+        else:
+            for source, local in self._copy_plan_:
+                local[time_index] = source[time_index]
 
     def iteration(self, time_index, date, daylight_saving):
         return True
@@ -0,0 +1,166 @@
+import os
+import hashlib
+import numpy as np
+
+# _________________ Disk_cache ___________________________
+
+
+class Disk_cache():
+    """Cache of numpy arrays stored in npz files
+
+    The caches are disabled by default (nothing is written to disk), they are enabled setting
+    Disk_cache.enabled = True or the environment variable OPENSIMULA_CACHE_ENABLE. The
+    environment variable OPENSIMULA_CACHE_DISABLE disables them in any case
+    The cache directory is OPENSIMULA_CACHE_DIR environment variable or ~/.cache/OpenSimula
+    Any error writing or reading the cache is ignored, the data is then calculated again
+    """
+    enabled = False
+
+    def __init__(self, name, max_size=None):
+        """
+        Args:
+            name (string): name of the cache, subdirectory of the cache directory
+            max_size (int, optional): maximum size in bytes, least recently used entries are removed
+        """
+        self._name_ = name
+        self.max_size = max_size
+
+    @staticmethod
+    def root_directory():
+        directory = os.environ.get("OPENSIMULA_CACHE_DIR")
+        if directory is None:
+            directory = os.path.join(
+                os.path.expanduser("~"), ".cache", "OpenSimula")
+        return directory
+
+    @property
+    def directory(self):
+        return os.path.join(Disk_cache.root_directory(), self._name_)
+
+    @property
+    def active(self):
+        if os.environ.get("OPENSIMULA_CACHE_DISABLE"):
+            return False
+        return Disk_cache.enabled or bool(os.environ.get("OPENSIMULA_CACHE_ENABLE"))
+
+    def key(self, *items):
+        """Key of the cache entry for the items
+
+        Args:
+            items: values that identify the entry, its repr is used
+
+        Returns:
+            string: key
+        """
+        return hashlib.sha1(repr(items).encode("utf-8")).hexdigest()
+
+    def file_key(self, file_name, *items):
+        """Key of the cache entry for a file, hash of its contents so it changes if the file is
+        modified even if its size and modification time are kept
+
+        Args:
+            file_name (string): file name
+            items: other values that identify the entry
+
+        Returns:
+            string: key
+        """
+        digest = hashlib.sha1()
+        with open(file_name, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return self.key(digest.hexdigest(), *items)
+
+    def load(self, key):
+        """Load the arrays of the cache entry
+
+        Args:
+            key (string): key of the entry
+
+        Returns:
+            dictionary: name -> numpy array, None if the entry does not exist
+        """
+        if not self.active:
+            return None
+        try:
+            file_name = self._file_name_(key)
+            with np.load(file_name) as data:
+                arrays = {name: data[name] for name in data.files}
+            if self.max_size is not None:
+                os.utime(file_name)  # Recently used
+            return arrays
+        except Exception:
+            return None
+
+    def save(self, key, arrays):
+        """Save the arrays in the cache entry
+
+        Args:
+            key (string): key of the entry
+            arrays (dictionary): name -> numpy array
+        """
+        if not self.active:
+            return
+        file_name = self._file_name_(key)
+        temp_file_name = f"{file_name}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_file_name, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(temp_file_name, file_name)
+        except Exception:
+            try:
+                os.remove(temp_file_name)
+            except OSError:
+                pass
+        if self.max_size is not None:
+            self._evict_()
+
+    def clear(self):
+        """Remove all the entries of the cache"""
+        for file_name, mtime, size in self._entries_():
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+
+    @staticmethod
+    def clear_all():
+        """Remove the entries of all the caches"""
+        try:
+            names = os.listdir(Disk_cache.root_directory())
+        except OSError:
+            return
+        for name in names:
+            if os.path.isdir(os.path.join(Disk_cache.root_directory(), name)):
+                Disk_cache(name).clear()
+
+    def _entries_(self):
+        # (file_name, mtime, size) of each entry
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".npz"):
+                        stat = entry.stat()
+                        entries.append(
+                            (entry.path, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            pass
+        return entries
+
+    def _evict_(self):
+        # Remove least recently used entries until the size is below max_size
+        entries = sorted(self._entries_(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        for file_name, mtime, file_size in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(file_name)
+                size = size - file_size
+            except OSError:
+                pass
+
+    def _file_name_(self, key):
+        return os.path.join(self.directory, key + ".npz")
@@ -35,6 +35,10 @@ class Parameter_container:
     def parameter_dict(self):
         return self._parameters_
 
+    def _name_changed_(self):
+        """Called when the name parameter changes, to be overwritten by child classes"""
+        pass
+
     def set_parameters(self, dictonary):
         """Read parameters from dictonary"""
         for key, value in dictonary.items():
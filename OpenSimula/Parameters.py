@@ -1,5 +1,6 @@
 import sys
-from py_expression_eval import Parser
+import numpy as np
+from py_expression_eval import Parser, TNUMBER, TOP1, TOP2, TVAR, TFUNCALL
 from OpenSimula.Child import Child
 
 # ___________________ Parameter _________________________
@@ -44,6 +45,13 @@ class Parameter(Child):
     def check(self):
         return []
 
+    def bind(self):
+        """Resolve references to other objects, nothing to do for most of the parameters"""
+        pass
+
+    def _references_version_(self):
+        return self._sim_._references_version_
+
     def _get_error_header_(self):
         return f'Error: {self.parent.parameter("name").value}->{self.key}. '
 
@@ -159,6 +167,8 @@ class Parameter_string(Parameter):
     @value.setter
     def value(self, value):
         self._value_ = str(value)
+        if self.key == "name" and self.parent is not None:
+            self.parent._name_changed_()
 
 
 class Parameter_string_list(Parameter):
@@ -418,6 +428,7 @@ class Parameter_component(Parameter):
             self._external_ = True
         else:
             self._external_ = False
+        self._bound_version_ = None
 
     @property
     def external(self):
@@ -429,15 +440,22 @@ class Parameter_component(Parameter):
 
     @property
     def component(self):
+        if self._bound_version_ != self._references_version_():
+            self.bind()
+        return self._bound_component_
+
+    def bind(self):
+        """Resolve the component, it is kept until the value or any name changes"""
         if self.external:
             splits = self.value.split("->")
             proj = self.parent.project().simulation().project(splits[0])
             if proj == None:
-                return None
+                self._bound_component_ = None
             else:
-                return proj.component(splits[1])
+                self._bound_component_ = proj.component(splits[1])
         else:
-            return self.parent.project().component(self.value)
+            self._bound_component_ = self.parent.project().component(self.value)
+        self._bound_version_ = self._references_version_()
 
     def check(self):
         errors = []
@@ -483,6 +501,7 @@ class Parameter_component_list(Parameter):
                 self._external_.append(True)
             else:
                 self._external_.append(False)
+        self._bound_version_ = None
 
     @property
     def external(self):
@@ -494,6 +513,12 @@ class Parameter_component_list(Parameter):
 
     @property
     def component(self):
+        if self._bound_version_ != self._references_version_():
+            self.bind()
+        return self._bound_component_
+
+    def bind(self):
+        """Resolve the components, they are kept until the value or any name changes"""
         components = []
         for i, element in enumerate(self.value):
             if self.external[i]:
@@ -505,7 +530,8 @@ class Parameter_component_list(Parameter):
                     components.append(proj.component(splits[1]))
             else:
                 components.append(self.parent.project().component(element))
-        return components
+        self._bound_component_ = components
+        self._bound_version_ = self._references_version_()
 
     def check(self):
         errors = []
@@ -555,6 +581,7 @@ class Parameter_variable(Parameter):
             self._external_ = True
         else:
             self._external_ = False
+        self._bound_version_ = None
 
         if format_error:
             msg = self._get_error_header_(
@@ -571,6 +598,12 @@ class Parameter_variable(Parameter):
 
     @property
     def variable(self):
+        if self._bound_version_ != self._references_version_():
+            self.bind()
+        return self._bound_variable_
+
+    def bind(self):
+        """Resolve the variable, it is kept until the value, any name or any variable changes"""
         try:
             if self.external:
                 splits = self._component_.split("->")
@@ -582,8 +615,8 @@ class Parameter_variable(Parameter):
                 var = self.parent.project().component(self._component_).variable(self._variable_)
         except Exception as error:
             var = None
-
-        return var
+        self._bound_variable_ = var
+        self._bound_version_ = self._references_version_()
 
     def check(self):
         errors = []
@@ -638,6 +671,7 @@ class Parameter_variable_list(Parameter):
                 self._external_.append(True)
             else:
                 self._external_.append(False)
+        self._bound_version_ = None
 
         if format_error:
             msg = self._get_error_header_(
@@ -654,6 +688,12 @@ class Parameter_variable_list(Parameter):
 
     @property
     def variable(self):
+        if self._bound_version_ != self._references_version_():
+            self.bind()
+        return self._bound_variable_
+
+    def bind(self):
+        """Resolve the variables, they are kept until the value, any name or any variable changes"""
         variables = []
         for i in range(len(self._value_)):
             try:
@@ -668,8 +708,8 @@ class Parameter_variable_list(Parameter):
                         self._component_[i]).variable(self._variable_[i]))
             except Exception as error:
                 variables.append(None)
-
-        return variables
+        self._bound_variable_ = variables
+        self._bound_version_ = self._references_version_()
 
     def check(self):
         errors = []
@@ -684,12 +724,170 @@ class Parameter_variable_list(Parameter):
 
 # _____________ Parameter_math_exp ___________________________
 
+# Operators of the parser that can be written directly as python operators
+_PYTHON_OPS2_ = {"+": "+", "-": "-", "*": "*", "/": "/", "%": "%", "^": "**", "**": "**",
+                 "==": "==", "!=": "!=", ">": ">", "<": "<", ">=": ">=", "<=": "<="}
+
+_parser_ = Parser()
+_compiled_math_exp_ = {}  # expression string -> compiled function
+_compiled_math_exp_array_ = {}  # expression string -> compiled function for arrays, None if not possible
+
+# numpy versions of the parser operators and functions, for the evaluation with arrays
+_NUMPY_OPS1_ = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sind": lambda a: np.sin(np.radians(a)),
+    "cosd": lambda a: np.cos(np.radians(a)),
+    "tand": lambda a: np.tan(np.radians(a)),
+    "asind": lambda a: np.degrees(np.arcsin(a)),
+    "acosd": lambda a: np.degrees(np.arccos(a)),
+    "atand": lambda a: np.degrees(np.arctan(a)),
+    "sqrt": np.sqrt, "abs": np.abs, "ceil": np.ceil, "floor": np.floor, "round": np.round,
+    "-": np.negative, "not": np.logical_not, "exp": np.exp
+}
+_NUMPY_OPS2_ = {"and": lambda a, b: np.where(a, b, a),  # python "a and b"
+                "or": lambda a, b: np.where(a, a, b),  # python "a or b"
+                "xor": np.logical_xor}
+_NUMPY_FUNCTIONS_ = {
+    "log": lambda a, base=None: np.log(a) if base is None else np.log(a) / np.log(base),
+    "min": lambda *args: np.minimum.reduce(np.broadcast_arrays(*args)),
+    "max": lambda *args: np.maximum.reduce(np.broadcast_arrays(*args)),
+    "pyt": np.hypot, "pow": np.power, "atan2": np.arctan2, "if": np.where
+}
+
+
+def _compile_math_exp_(expression):
+    """Compile a math expression to a python function of the values dictionary
+
+    The expression is parsed once and the reverse polish tokens of py_expression_eval
+    are translated to python code. Compiled functions are shared by all the parameters
+    with the same expression.
+
+    Args:
+        expression (string): math expression
+
+    Returns:
+        function: f(values_dic) that evaluates the expression
+    """
+    if expression not in _compiled_math_exp_:
+        source = _math_exp_source_(_parser_.parse(expression))
+        namespace = {"_o1_": _parser_.ops1, "_o2_": _parser_.ops2, "_f_": _parser_.functions}
+        _compiled_math_exp_[expression] = eval("lambda v: " + source, namespace)
+    return _compiled_math_exp_[expression]
+
+
+def _compile_math_exp_array_(expression):
+    """Compile a math expression to a python function of a dictionary of numpy arrays
+
+    Same code as _compile_math_exp_ using numpy operators and functions.
+
+    Args:
+        expression (string): math expression
+
+    Returns:
+        function: f(values_dic) that evaluates the expression for arrays, None if the
+            expression uses operators or functions without numpy version (random, fac, ...)
+    """
+    if expression not in _compiled_math_exp_array_:
+        parsed_exp = _parser_.parse(expression)
+        vectorizable = True
+        for token in parsed_exp.tokens:
+            if token.type_ == TOP1 and token.index_ not in _NUMPY_OPS1_:
+                vectorizable = False
+            elif token.type_ == TOP2 and token.index_ not in _PYTHON_OPS2_ and token.index_ not in _NUMPY_OPS2_ and token.index_ != ",":
+                vectorizable = False
+            elif token.type_ == TVAR and token.index_ in _parser_.functions and token.index_ not in _NUMPY_FUNCTIONS_:
+                vectorizable = False
+        if vectorizable:
+            source = _math_exp_source_(parsed_exp)
+            namespace = {"_o1_": _NUMPY_OPS1_, "_o2_": _NUMPY_OPS2_, "_f_": _NUMPY_FUNCTIONS_}
+            _compiled_math_exp_array_[expression] = eval("lambda v: " + source, namespace)
+        else:
+            _compiled_math_exp_array_[expression] = None
+    return _compiled_math_exp_array_[expression]
+
+
+def _math_exp_source_(parsed_exp):
+    # Same stack algorithm as Expression.evaluate, building code instead of values
+    # Argument lists (',' operator) are stored as python lists of code strings
+    stack = []
+    for token in parsed_exp.tokens:
+        if token.type_ == TNUMBER:
+            stack.append(repr(token.number_))
+        elif token.type_ == TOP2:
+            n2 = stack.pop()
+            n1 = stack.pop()
+            if token.index_ == ",":
+                if isinstance(n1, list):
+                    stack.append(n1 + [n2])
+                else:
+                    stack.append([n1, n2])
+            elif token.index_ in _PYTHON_OPS2_:
+                stack.append(
+                    f"({_args_source_(n1)} {_PYTHON_OPS2_[token.index_]} {_args_source_(n2)})")
+            else:
+                stack.append(
+                    f"_o2_[{token.index_!r}]({_args_source_(n1)}, {_args_source_(n2)})")
+        elif token.type_ == TVAR:
+            if token.index_ in _parser_.functions:
+                stack.append(f"_f_[{token.index_!r}]")
+            else:
+                stack.append(f"v[{token.index_!r}]")
+        elif token.type_ == TOP1:
+            n1 = stack.pop()
+            if token.index_ == "-":
+                stack.append(f"(-{_args_source_(n1)})")
+            else:
+                stack.append(f"_o1_[{token.index_!r}]({_args_source_(n1)})")
+        elif token.type_ == TFUNCALL:
+            n1 = stack.pop()
+            f = stack.pop()
+            if isinstance(n1, list):
+                stack.append(f"{f}({', '.join(n1)})")
+            else:
+                stack.append(f"{f}({n1})")
+        else:
+            raise Exception("invalid Expression")
+    if len(stack) != 1:
+        raise Exception("invalid Expression (parity)")
+    return _args_source_(stack[0])
+
+
+def _args_source_(item):
+    if isinstance(item, list):
+        return "[" + ", ".join(item) + "]"
+    else:
+        return item
+
+
+def _evaluate_compiled_(function, values_dic):
+    try:
+        return function(values_dic)
+    except KeyError as error:
+        raise Exception("undefined variable: " + str(error.args[0]))
+
+
+def _evaluate_array_(expression, values_dic, n):
+    if n is None:
+        n = len(next(iter(values_dic.values())))
+    function = _compile_math_exp_array_(expression)
+    if function is None:  # Evaluation for each element
+        function = _compile_math_exp_(expression)
+        result = np.zeros(n)
+        for i in range(n):
+            values = {key: array[i] for key, array in values_dic.items()}
+            result[i] = _evaluate_compiled_(function, values)
+        return result
+    else:
+        result = _evaluate_compiled_(function, values_dic)
+        return np.broadcast_to(np.asarray(result, dtype=float), n).copy()
+
 
 class Parameter_math_exp(Parameter):
     def __init__(self, key, value="0.0", unit=""):
         Parameter.__init__(self, key, value)
         self._unit_ = unit
-        self._parser_ = Parser()
+        self._compiled_ = None
 
     @property
     def unit(self):
@@ -702,23 +900,38 @@ class Parameter_math_exp(Parameter):
     @value.setter
     def value(self, value):
         self._value_ = str(value)
+        self._compiled_ = None
 
     def check(self):
         try:
-            self._parser_.parse(self.value)
+            _compile_math_exp_(self.value)
         except Exception as error:
             return [self._get_error_header_()+f"{str(error)}"]
         return []
 
     def evaluate(self, values_dic):
-        return self._parser_.parse(self.value).evaluate(values_dic)
+        if self._compiled_ is None:
+            self._compiled_ = _compile_math_exp_(self.value)
+        return _evaluate_compiled_(self._compiled_, values_dic)
+
+    def evaluate_array(self, values_dic, n=None):
+        """Evaluate the expression for arrays of values
+
+        Args:
+            values_dic (dictionary): symbol -> numpy array, all with the same size
+            n (int, optional): size of the result, needed if values_dic is empty
+
+        Returns:
+            numpy array: values of the expression
+        """
+        return _evaluate_array_(self.value, values_dic, n)
 
 
 class Parameter_math_exp_list(Parameter):
     def __init__(self, key, value=["0.0"], unit=""):
         Parameter.__init__(self, key, value)
         self._unit_ = unit
-        self._parser_ = Parser()
+        self._compiled_ = None
 
     @property
     def unit(self):
@@ -740,15 +953,31 @@ class Parameter_math_exp_list(Parameter):
         for el in value:
             el = str(el)
         self._value_ = value
+        self._compiled_ = None
 
     def check(self):
         errors = []
         for n in self.value:
             try:
-                self._parser_.parse(n)
+                _compile_math_exp_(str(n))
             except Exception as error:
                 errors.append(self._get_error_header_()+f"{str(error)}")
         return errors
 
     def evaluate(self, i, values_dic):
-        return self._parser_.parse(self.value[i]).evaluate(values_dic)
+        if self._compiled_ is None:
+            self._compiled_ = [_compile_math_exp_(str(n)) for n in self.value]
+        return _evaluate_compiled_(self._compiled_[i], values_dic)
+
+    def evaluate_array(self, i, values_dic, n=None):
+        """Evaluate the expression i for arrays of values
+
+        Args:
+            i (int): index of the expression
+            values_dic (dictionary): symbol -> numpy array, all with the same size
+            n (int, optional): size of the result, needed if values_dic is empty
+
+        Returns:
+            numpy array: values of the expression
+        """
+        return _evaluate_array_(str(self.value[i]), values_dic, n)
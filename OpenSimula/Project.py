@@ -3,7 +3,8 @@ import datetime as dt
 import numpy as np
 import pandas as pd
 from OpenSimula.Parameter_container import Parameter_container
-from OpenSimula.Parameters import Parameter_int, Parameter_string, Parameter_string_list, Parameter_boolean
+from OpenSimula.Parameters import Parameter_int, Parameter_string, Parameter_string_list, Parameter_boolean, Parameter_options
+from OpenSimula.Variable_store import Variable_store
 from OpenSimula.components import *
 
 
@@ -34,6 +35,11 @@ class Project(Parameter_container):
         self.add_parameter(Parameter_string(
             "daylight_saving_end_time", "28/10/2001 02:00:00"))
         self.add_parameter(Parameter_int("n_max_iteration", 1000, min=1))
+        # Glob patterns "type.variable" or "component_name.variable" of the variables kept for all the time steps
+        self.add_parameter(Parameter_string_list("output_variables", ["*"]))
+        # dtype of the output variables, state variables are always float64
+        self.add_parameter(Parameter_options(
+            "result_dtype", "float64", ["float64", "float32"]))
 
         self.add_parameter(
             Parameter_string_list(
@@ -63,6 +69,24 @@ class Project(Parameter_container):
         )
         self._sim_ = sim
         self._components_ = []
+        self._components_index_ = None
+        self._variable_store_ = Variable_store()
+
+    def _name_changed_(self):
+        self._sim_._invalidate_projects_index_()
+
+    def _invalidate_components_index_(self):
+        """The name index will be rebuilt in the next search"""
+        self._components_index_ = None
+        self._sim_._references_changed_()
+
+    def _create_components_index_(self):
+        # First component with each name, as the search in the list
+        self._components_index_ = {}
+        for comp in self._components_:
+            name = comp.parameter("name").value
+            if name not in self._components_index_:
+                self._components_index_[name] = comp
 
     def del_component(self, component):
         """Delete component from Project
@@ -71,6 +95,7 @@ class Project(Parameter_container):
             component (Component): Component to be removed from the project
         """
         self._components_.remove(component)
+        self._invalidate_components_index_()
 
     def component(self, name):
         """Find and return component with its name
@@ -81,10 +106,9 @@ class Project(Parameter_container):
         Returns:
             component (Component): component found, None if not found.
         """
-        for comp in self._components_:
-            if comp.parameter("name").value == name:
-                return comp
-        return None
+        if self._components_index_ is None:
+            self._create_components_index_()
+        return self._components_index_.get(name)
 
     def component_list(self, type="all"):
         """Components list in the project
@@ -101,6 +125,10 @@ class Project(Parameter_container):
                     comp_list.append(comp)
         return comp_list
 
+    def variable_store(self):
+        """Variable_store with the values of the variables of the last simulation"""
+        return self._variable_store_
+
     def simulation(self):
         """
         Returns:
@@ -108,6 +136,14 @@ class Project(Parameter_container):
         """
         return self._sim_
 
+    def print(self, msg):
+        """Print message in the simulation environment
+
+        Args:
+            msg (string): message to print
+        """
+        self._sim_.print(msg)
+
     def component_dataframe(self, type="all", string_format=False):
         data = pd.DataFrame()
         comp_list = self.component_list(type)
@@ -132,6 +168,7 @@ class Project(Parameter_container):
             clase = globals()[type]
             comp = clase(name, self)
             self._components_.append(comp)
+            self._invalidate_components_index_()
             return comp
         except KeyError:
             return None
@@ -363,6 +400,7 @@ class Project(Parameter_container):
             else:
                 names.append(comp.parameter("name").value)
 
+        self._bind_references_()
         if len(errors) == 0:
             self._sim_.print("ok")
         else:
@@ -374,19 +412,14 @@ class Project(Parameter_container):
     def simulate(self):
         """Project Time Simulation"""
         n = self.parameter("n_time_steps").value
-        date = dt.datetime.strptime(
-            self.parameter("initial_time").value, "%d/%m/%Y %H:%M:%S"
-        )
         delta_t = self.parameter("time_step").value
-        date = date + dt.timedelta(0, delta_t/2)  # Centered in the interval
-        if (self.parameter("daylight_saving").value):
-            date_dls_start = dt.datetime.strptime(self.parameter(
-                "daylight_saving_start_time").value, "%d/%m/%Y %H:%M:%S")
-            date_dls_end = dt.datetime.strptime(self.parameter(
-                "daylight_saving_end_time").value, "%d/%m/%Y %H:%M:%S")
+        dates = self.dates()
+        daylight_saving_array = self.daylight_saving(dates)
 
         self._set_ordered_component_list_()
         self._pre_simulation_(n, delta_t)
+        self._pre_calculation_(dates, daylight_saving_array)
+        self._set_dispatch_lists_()
 
         self._sim_.print(
             f"Simulating {self.parameter('name').value}: ", add_new_line=False
@@ -398,10 +431,8 @@ class Project(Parameter_container):
                 self._sim_.print(str(int(show_percent)) +
                                  "% ", add_new_line=False)
                 show_percent = show_percent + 10.0
-            daylight_saving = False
-            if (self.parameter("daylight_saving").value):
-                if (date > date_dls_start and date < date_dls_end):
-                    daylight_saving = True
+            date = dates[i]
+            daylight_saving = daylight_saving_array[i]
 
             self._pre_iteration_(i, date, daylight_saving)
             converge = False
@@ -411,32 +442,60 @@ class Project(Parameter_container):
                 if self._iteration_(i, date, daylight_saving):
                     converge = True
             self._post_iteration_(i, date, daylight_saving, converge)
-            date = date + dt.timedelta(0, delta_t)
 
         self._sim_.print(" End")
         self._post_simulation_()
 
+    def _bind_references_(self):
+        """Resolve all the component and variable references of the parameters"""
+        for comp in self._components_:
+            for key, param in comp.parameter_dict().items():
+                param.bind()
+
     def _pre_simulation_(self, n_time_steps, delta_t):
+        self._variable_store_.allocate(
+            self._ordered_component_list_, n_time_steps, self.parameter("output_variables").value,
+            self.parameter("result_dtype").value)
         for comp in self._ordered_component_list_:
             comp.pre_simulation(n_time_steps, delta_t)
+        self._bind_references_()
+
+    def _pre_calculation_(self, dates, daylight_saving):
+        for comp in self._ordered_component_list_:
+            comp.pre_calculation(dates, daylight_saving)
+        for comp in self._ordered_component_list_:
+            comp._create_copy_plan_()
 
     def _post_simulation_(self):
         for comp in self._ordered_component_list_:
             comp.post_simulation()
 
-    def _pre_iteration_(self, time_index, date, dayligth_saving):
+    def _set_dispatch_lists_(self):
+        """Components that implement each time step hook, in simulation order"""
+        self._pre_iteration_list_ = []
+        self._iteration_list_ = []
+        self._post_iteration_list_ = []
         for comp in self._ordered_component_list_:
+            if comp.implements("pre_iteration"):
+                self._pre_iteration_list_.append(comp)
+            if comp.implements("iteration"):
+                self._iteration_list_.append(comp)
+            if comp.implements("post_iteration"):
+                self._post_iteration_list_.append(comp)
+
+    def _pre_iteration_(self, time_index, date, dayligth_saving):
+        for comp in self._pre_iteration_list_:
             comp.pre_iteration(time_index, date, dayligth_saving)
 
     def _iteration_(self, time_index, date, dayligth_saving):
         converge = True
-        for comp in self._ordered_component_list_:
+        for comp in self._iteration_list_:
             if not comp.iteration(time_index, date, dayligth_saving):
                 converge = False
         return converge
 
     def _post_iteration_(self, time_index, date, dayligth_saving, converged):
-        for comp in self._ordered_component_list_:
+        for comp in self._post_iteration_list_:
             comp.post_iteration(time_index, date, dayligth_saving, converged)
 
     def dates(self):
@@ -454,6 +513,26 @@ class Project(Parameter_container):
 
         return array
 
+    def daylight_saving(self, dates):
+        """Daylight saving for each date
+
+        Args:
+            dates (datetime array): dates
+
+        Returns:
+            boolean array: True if daylight saving time for each date
+        """
+        array = np.full(len(dates), False)
+        if (self.parameter("daylight_saving").value):
+            date_dls_start = dt.datetime.strptime(self.parameter(
+                "daylight_saving_start_time").value, "%d/%m/%Y %H:%M:%S")
+            date_dls_end = dt.datetime.strptime(self.parameter(
+                "daylight_saving_end_time").value, "%d/%m/%Y %H:%M:%S")
+            for i in range(len(dates)):
+                if (dates[i] > date_dls_start and dates[i] < date_dls_end):
+                    array[i] = True
+        return array
+
     def _repr_html_(self):
         html = f"<h3>Project: {self.parameter('name').value}</h3><p>{self.parameter('description').value}</p>"
         html += "<strong>Parameters:</strong>"
@@ -1,5 +1,7 @@
 from OpenSimula.Project import Project
+from OpenSimula.Disk_cache import Disk_cache
 import pandas as pd
+import numpy as np
 import plotly.express as px
 from plotly.subplots import make_subplots
 
@@ -9,6 +11,9 @@ class Simulation:
 
     def __init__(self):
         self._projects_ = []
+        self._projects_index_ = None
+        self._references_version_ = 0
+        self._shared_data_store_ = {}
         self.console_print = True
         self._messages_ = []
         self._new_line_ = True
@@ -22,6 +27,7 @@ class Simulation:
         if self.project(project_name) == None:
             pro = Project(project_name, self)
             self._projects_.append(pro)
+            self._invalidate_projects_index_()
             return pro
         else:
             self.print("Error: There is already a project named: "+project_name)
@@ -34,6 +40,51 @@ class Simulation:
             project (Project): Project to be removed from the simulation environment
         """
         self._projects_.remove(project)
+        self._invalidate_projects_index_()
+
+    def _invalidate_projects_index_(self):
+        """The name index will be rebuilt in the next search"""
+        self._projects_index_ = None
+        self._references_changed_()
+
+    def _references_changed_(self):
+        """Components, projects or variables have changed, bound references must be resolved again"""
+        self._references_version_ += 1
+
+    def _shared_data_(self, key, calculate):
+        """Data shared by all the projects of the simulation, e.g. weather files
+
+        Args:
+            key (tuple): key that identifies the data
+            calculate (function): function that returns the data (dictionary of numpy arrays) if it is not stored
+
+        Returns:
+            dictionary: stored data, the numpy arrays are read-only
+        """
+        if key not in self._shared_data_store_:
+            data = calculate()
+            for value in data.values():
+                if isinstance(value, np.ndarray):
+                    value.flags.writeable = False
+            self._shared_data_store_[key] = data
+        return self._shared_data_store_[key]
+
+    def clear_shared_data(self):
+        """Remove all the data shared by the projects (e.g. weather files), it will be read again when needed"""
+        self._shared_data_store_ = {}
+
+    def clear_disk_cache(self):
+        """Remove the data cached on disk (weather files, construction transfer functions),
+        the cache is only used if enabled with Disk_cache.enabled = True"""
+        Disk_cache.clear_all()
+
+    def _create_projects_index_(self):
+        # First project with each name, as the search in the list
+        self._projects_index_ = {}
+        for pro in self._projects_:
+            name = pro.parameter("name").value
+            if name not in self._projects_index_:
+                self._projects_index_[name] = pro
 
     def project(self, name):
         """Find and return a project using its name
@@ -44,10 +95,9 @@ class Simulation:
         Returns:
             project (Project): project found, None if not found.
         """
-        for pro in self._projects_:
-            if pro.parameter("name").value == name:
-                return pro
-        return None
+        if self._projects_index_ is None:
+            self._create_projects_index_()
+        return self._projects_index_.get(name)
 
     def project_list(self):
         """Projects list in the simulation environment
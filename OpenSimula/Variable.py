@@ -5,11 +5,26 @@ from OpenSimula.Child import Child
 
 
 class Variable(Child):
-    def __init__(self, key, unit=""):
+    def __init__(self, key, unit="", history=0, state=False, pre_calculated=False):
+        """
+        Args:
+            key (string): name of the variable
+            unit (string, optional): unit of the values
+            history (int, optional): previous time steps read during the time loop, kept
+                when the variable is not selected as output
+            state (bool, optional): values read back by the solver, kept in float64 whatever
+                the result dtype. Variables with history or pre_calculated are always state
+            pre_calculated (bool, optional): values that may be calculated for all the time
+                steps in pre_calculation, always kept for all the time steps
+        """
         Child.__init__(self)
         self._key_ = key
         self._unit_ = unit
+        self.history = history
+        self._state_ = state
+        self.pre_calculated = pre_calculated
         self._values_ = None
+        self._store_values_ = None
         self._sim_ = None
 
     @property
@@ -24,9 +39,75 @@ class Variable(Child):
     def values(self):
         return self._values_
 
+    @values.setter
+    def values(self, values):
+        """Set the values of all the time steps"""
+        self._values_[:] = values
+
+    @property
+    def state(self):
+        """True if the values are read back by the solver: state, with history or
+        pre-calculated (inputs of the time loop)"""
+        return self._state_ or self.history > 0 or self.pre_calculated
+
+    @property
+    def stored(self):
+        """True if the values of all the time steps are kept"""
+        return not isinstance(self._values_, Rolling_values)
+
+    def share_values(self, values):
+        """Use as values a read-only array shared with other variables
+
+        Args:
+            values (numpy array): values of all the time steps
+        """
+        self._values_ = values
+
     @property
     def unit(self):
         return self._unit_
     
     def initialise(self,n,default=0.0):
-        self._values_ = np.full(n, default)
+        # Column of the project Variable_store if it has been assigned, with the values of
+        # the last time steps if the variable is not selected as output
+        if self._store_values_ is not None:
+            self._store_values_[:] = default
+            if len(self._store_values_) == n:
+                self._values_ = self._store_values_
+            else:
+                self._values_ = Rolling_values(self, self._store_values_, n)
+        else:
+            self._values_ = np.full(n, default)
+
+
+# _________________ Rolling_values ___________________________
+
+
+class Rolling_values():
+    """Values of the last time steps of a variable, indexed by time step as the full array
+
+    Only single time steps can be read or written, variables set for all the time steps at
+    once must be created as pre_calculated
+    """
+
+    def __init__(self, variable, buffer, n):
+        self._variable_ = variable
+        self.buffer = buffer
+        self._n_ = n
+
+    def __len__(self):
+        return self._n_
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.buffer[index % len(self.buffer)]
+        raise IndexError(self._error_message_())
+
+    def __setitem__(self, index, value):
+        if isinstance(index, (int, np.integer)):
+            self.buffer[index % len(self.buffer)] = value
+        else:
+            raise IndexError(self._error_message_())
+
+    def _error_message_(self):
+        return f"Only the last {len(self.buffer)} time steps of '{self._variable_.key}' are kept, it is not selected as output"
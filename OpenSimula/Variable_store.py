@@ -0,0 +1,143 @@
+import os
+import fnmatch
+import numpy as np
+from OpenSimula.Variable import Rolling_values
+
+# _________________ Variable_store ___________________________
+
+
+class Variable_store():
+    """Values of the variables of a project, one block (time steps, variables) for each component type
+
+    The columns of each block are grouped by variable key: the components of the type that
+    have the variable are in consecutive columns, so block[:, first:last] holds the variable
+    of all of them. The values of each Variable are a view (column) of its block
+
+    Variables not selected as output are kept in a second block for each type with only the
+    last time steps, the row of time step i is i % rows. Pre-calculated variables, inputs
+    of the time loop, are always kept for all the time steps.
+
+    Blocks use the result dtype, with a float64 block "type_state" for the state variables
+    (read in later time steps or by the solver, and pre-calculated inputs) if the result
+    dtype is not float64. Every array of the variables values is allocated by the store
+    """
+
+    def __init__(self):
+        self._blocks_ = {}
+        self._names_ = {}
+        self._rolling_blocks_ = {}
+        self._location_ = {}
+
+    def allocate(self, components, n_time_steps, output_variables=["*"], dtype="float64"):
+        """Create the blocks and assign a column to each variable of the components
+
+        Args:
+            components (Component list): components of the project
+            n_time_steps (int): number of time steps
+            output_variables (string list, optional): glob patterns of the variables whose values
+                are kept for all the time steps, "type.variable" or "component_name.variable"
+            dtype (string, optional): numpy dtype of the values kept for all the time steps
+        """
+        self._blocks_ = {}
+        self._names_ = {}
+        self._rolling_blocks_ = {}
+        self._location_ = {}
+        variables = {}
+        rolling = {}
+        for comp in components:
+            if comp.store_variables:
+                type = comp.parameter("type").value
+                name = comp.parameter("name").value
+                type_variables = variables.setdefault(type, {})
+                type_rolling = rolling.setdefault(type, {})
+                for key, var in comp.variable_dict().items():
+                    if var.pre_calculated or var.history + 1 >= n_time_steps or \
+                            self._selected_(type, name, key, output_variables):
+                        type_variables.setdefault(key, []).append(var)
+                    else:
+                        type_rolling.setdefault(key, []).append(var)
+        for type, type_variables in variables.items():
+            columns = [var for key in type_variables for var in type_variables[key]]
+            if np.dtype(dtype) == np.float64:
+                groups = {type: (columns, np.float64)}
+            else:
+                groups = {type: ([var for var in columns if not var.state], dtype),
+                          type + "_state": ([var for var in columns if var.state], np.float64)}
+            for name, (block_columns, block_dtype) in groups.items():
+                if len(block_columns) == 0:
+                    continue
+                block = np.zeros(
+                    (n_time_steps, len(block_columns)), dtype=block_dtype)
+                self._blocks_[name] = block
+                self._names_[name] = [
+                    var.parent.parameter("name").value + "." + var.key for var in block_columns]
+                self._assign_columns_(block, block_columns)
+        for type, type_rolling in rolling.items():
+            columns = [var for key in type_rolling for var in type_rolling[key]]
+            if len(columns) == 0:
+                continue
+            rows = max(var.history for var in columns) + 1
+            block = np.zeros((rows, len(columns)))
+            self._rolling_blocks_[type] = block
+            self._assign_columns_(block, columns)
+
+    def _selected_(self, type, name, key, output_variables):
+        for pattern in output_variables:
+            if fnmatch.fnmatchcase(type + "." + key, pattern) or fnmatch.fnmatchcase(name + "." + key, pattern):
+                return True
+        return False
+
+    def _assign_columns_(self, block, columns):
+        for j in range(len(columns)):
+            self._location_[id(columns[j])] = (block, j)
+            columns[j]._store_values_ = block[:, j]
+
+    def block_names(self):
+        """Names of the blocks: component types and "type_state" for the float64 state blocks"""
+        return list(self._blocks_.keys())
+
+    def block(self, name):
+        """Block of a component type
+
+        Args:
+            name (string): component type or "type_state"
+
+        Returns:
+            (numpy array, string list): block (time steps, variables) and name of each column ("component.variable")
+        """
+        return self._blocks_[name], self._names_[name]
+
+    def location(self, variable):
+        """Block and column of a variable
+
+        Args:
+            variable (Variable): variable
+
+        Returns:
+            (numpy array, int): block and column, None if the variable is not in the store or
+            it does not use its column (shared values)
+        """
+        location = self._location_.get(id(variable))
+        if location is None:
+            return None
+        block = location[0]
+        values = variable.values
+        if isinstance(values, Rolling_values):
+            values = values.buffer
+        if values is None or values.base is not block:
+            return None
+        return location
+
+    def save(self, directory):
+        """Save each block as a npy file, name.npy, and the names of its columns, name.txt
+
+        The npy files can be memory-mapped with numpy.load(file_name, mmap_mode="r")
+
+        Args:
+            directory (string): directory of the files, created if it does not exist
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, block in self._blocks_.items():
+            np.save(os.path.join(directory, name + ".npy"), block)
+            with open(os.path.join(directory, name + ".txt"), "w") as f:
+                f.write("\n".join(self._names_[name]))
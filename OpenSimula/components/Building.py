@@ -1,12 +1,33 @@
 from OpenSimula.Component import Component
 from OpenSimula.Parameters import Parameter_component, Parameter_float
+from OpenSimula.Variable import Variable
+from OpenSimula.components.Construction import Conduction_history
 import numpy as np
+from scipy import sparse
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import splu
 import math
 import psychrolib as sicro
 import pyvista as pv
 
+# Surface type codes, index in the list
+_SURFACE_TYPES_ = ["Exterior_surface", "Underground_surface", "Interior_surface",
+                   "Virtual_exterior_surface", "Virtual_interior_surface", "Opening"]
+EXTERIOR, UNDERGROUND, INTERIOR, VIRTUAL_EXTERIOR, VIRTUAL_INTERIOR, OPENING = range(6)
+# Surface variables calculated or used by the building in each time step
+_STACKED_VARIABLES_ = ["T_s0", "T_s1", "q_cd0", "q_cd1", "p_0", "p_1", "E_dif", "T_rm",
+                       "q_sol0", "q_sol1", "q_swig0", "q_swig1", "q_lwig0", "q_lwig1",
+                       "E_ref", "E_ref_tra", "f_0", "debug_f", "debug_f0", "debug_f1"]
+# Space variables used or calculated by the building in each time step
+_SPACE_VARIABLES_ = ["temperature", "people_convective", "people_radiant", "light_convective",
+                     "light_radiant", "other_gains_convective", "other_gains_radiant",
+                     "infiltration_flow", "solar_direct_gains", "Q_heating", "Q_cooling"]
+
 
 class Building(Component):
+    # Sparse matrices are used for buildings with more surfaces
+    SPARSE_THRESHOLD = 1000
+
     def __init__(self, name, project):
         Component.__init__(self, name, project)
         self.parameter("type").value = "Building"
@@ -30,6 +51,7 @@ class Building(Component):
         self.LAMBDA = 2501  # J/g Latent heat of water at 0ºC
 
         # Variables
+        self.add_variable(Variable("n_iterations", ""))
 
     def check(self):
         errors = super().check()
@@ -37,10 +59,18 @@ class Building(Component):
             errors.append(
                 f"Error: {self.parameter('name').value}, file_met must be defined.")
         self._create_spaces_surfaces_list()
+        # Surfaces calculate their heat fluxes in post_iteration before the building updates the conduction history
+        order = self.project().parameter("simulation_order").value
+        for type in sorted({surface.parameter("type").value for surface in self.surfaces}):
+            if type not in order or ("Building" in order and order.index(type) > order.index("Building")):
+                errors.append(
+                    f"Error: {self.parameter('name').value}, {type} must be before Building in the project simulation_order.")
         return errors
 
     def pre_simulation(self, n_time_steps, delta_t):
         super().pre_simulation(n_time_steps, delta_t)
+        self._n_time_steps = n_time_steps
+        self._n_not_settled = 0  # Time steps without perfect conditioning convergence
         self._file_met = self.parameter("file_met").component
         sicro.SetUnitSystem(sicro.SI)
         self.ATM_PRESSURE = sicro.GetStandardAtmPressure(
@@ -48,17 +78,20 @@ class Building(Component):
         # Density for convert volumetric to mass flows
         self.RHO = sicro.GetDryAirDensity(22.5, self.ATM_PRESSURE)
         self._create_spaces_surfaces_list()
+        self._create_surfaces_arrays()
         self._create_ff_matrix()
         self._create_B_matrix()
         self._create_SW_matrices()
         self._create_LW_matrices()
         self._create_K_matrices()
+        self._create_conduction_history()
 
     def _create_spaces_surfaces_list(self):
         project_spaces_list = self.project().component_list(type="Space")
         self.spaces = []
         self.surfaces = []
         self.sides = []
+        surfaces_space_index = []
         for space in project_spaces_list:
             if (space.parameter("building").component == self):
                 self.spaces.append(space)
@@ -66,108 +99,303 @@ class Building(Component):
                     self.surfaces.append(surface)
                 for side in space.sides:
                     self.sides.append(side)
+                surfaces_space_index.extend(
+                    [len(self.spaces) - 1] * len(space.surfaces))
+        # Index of the space of each surface (the space of each side for interior surfaces)
+        self.surfaces_space_index = np.array(surfaces_space_index, dtype=int)
+
+    def _create_surfaces_arrays(self):
+        n = len(self.surfaces)
+        self.surfaces_type = np.array(
+            [_SURFACE_TYPES_.index(surface.parameter("type").value) for surface in self.surfaces], dtype=int)
+        self.sides_array = np.array(self.sides, dtype=int)
+        self.area_vector = np.array(
+            [surface.area for surface in self.surfaces], dtype=float)
+        # Index of the surfaces of each type
+        self._index = {}
+        for code in range(len(_SURFACE_TYPES_)):
+            self._index[code] = np.flatnonzero(self.surfaces_type == code)
+        self._index["interior_0"] = np.flatnonzero(
+            (self.surfaces_type == INTERIOR) & (self.sides_array == 0))
+        self._index["interior_1"] = np.flatnonzero(
+            (self.surfaces_type == INTERIOR) & (self.sides_array == 1))
+        self._index["opaque_1"] = np.flatnonzero(np.isin(
+            self.surfaces_type, [EXTERIOR, UNDERGROUND]) | ((self.surfaces_type == INTERIOR) & (self.sides_array == 1)))
+        self._index["E_dif"] = np.flatnonzero(np.isin(
+            self.surfaces_type, [EXTERIOR, VIRTUAL_EXTERIOR, OPENING]))
+        not_virtual = ~np.isin(self.surfaces_type, [
+                               VIRTUAL_EXTERIOR, VIRTUAL_INTERIOR])
+        self._index["T_s0"] = np.flatnonzero(not_virtual & (self.sides_array == 0))
+        self._index["T_s1"] = np.flatnonzero(not_virtual & (self.sides_array == 1))
+        # Group of the spaces variables
+        self._index["spaces"] = np.arange(len(self.spaces))
+        # Opening diffuse solar properties of the interior side
+        opening = [self.surfaces[i] for i in self._index[OPENING]]
+        self._opening_alpha = np.array(
+            [o.radiant_property("alpha", "solar_diffuse", 1) for o in opening], dtype=float)
+        self._opening_tau = np.array(
+            [o.radiant_property("tau", "solar_diffuse", 1) for o in opening], dtype=float)
+        self._opening_alpha_other = np.array(
+            [o.radiant_property("alpha_other_side", "solar_diffuse", 1) for o in opening], dtype=float)
+        self._create_stacked_variables()
+
+    def _create_stacked_variables(self):
+        # Surfaces and spaces variables are columns of the project Variable_store, one block for
+        # each component type, so the building reads and writes a group of surfaces or the spaces
+        # with one index operation for each type. Row of time step i is i % rows (last time steps blocks)
+        store = self.project().variable_store()
+        self._location = {}
+        for keys, components in [(_STACKED_VARIABLES_, self.surfaces), (_SPACE_VARIABLES_, self.spaces)]:
+            for key in keys:
+                for comp in components:
+                    if key in comp.variable_dict():
+                        variable = comp.variable(key)
+                        location = store.location(variable)
+                        if location is None:  # Not in the store, column of its own array
+                            location = (variable.values[:, np.newaxis], 0)
+                        self._location[(key, id(comp))] = location
+        self._access = {}
+
+    def _get_access(self, key, group):
+        # (block, columns, positions in the group) for each block of the components of the group
+        access = self._access.get((key, group))
+        if access is None:
+            components = self.spaces if group == "spaces" else self.surfaces
+            blocks = {}
+            for position, i in enumerate(self._index[group]):
+                block, column = self._location[(key, id(components[i]))]
+                entry = blocks.setdefault(id(block), (block, [], []))
+                entry[1].append(column)
+                entry[2].append(position)
+            access = [(block, np.array(columns, dtype=int), np.array(positions, dtype=int))
+                      for block, columns, positions in blocks.values()]
+            self._access[(key, group)] = access
+        return access
+
+    def _get_values(self, key, time_i, group):
+        access = self._get_access(key, group)
+        if len(access) == 1:
+            block, columns, positions = access[0]
+            return block[time_i % len(block), columns]
+        values = np.empty(len(self._index[group]))
+        for block, columns, positions in access:
+            values[positions] = block[time_i % len(block), columns]
+        return values
+
+    def _set_values(self, key, time_i, group, array):
+        access = self._get_access(key, group)
+        if len(access) == 1:
+            block, columns, positions = access[0]
+            block[time_i % len(block), columns] = array
+        else:
+            for block, columns, positions in access:
+                block[time_i % len(block), columns] = array[positions]
+
+    def _create_conduction_history(self):
+        # Interior surfaces are twice in the surfaces list
+        self.real_surfaces = []
+        for i in np.flatnonzero(np.isin(self.surfaces_type, [EXTERIOR, UNDERGROUND, INTERIOR])):
+            if self.surfaces[i] not in self.real_surfaces:
+                self.real_surfaces.append(self.surfaces[i])
+        self._conduction_history = Conduction_history(
+            [surface.parameter("construction").component for surface in self.real_surfaces],
+            self.parameter("initial_temperature").value)
+        # First position of the real surfaces in the surfaces list
+        first = {}
+        for i in range(len(self.surfaces)):
+            first.setdefault(id(self.surfaces[i]), i)
+        self._index["real"] = np.array(
+            [first[id(surface)] for surface in self.real_surfaces], dtype=int)
+        self._conduction_values = np.zeros((len(self.real_surfaces), 4))
+
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        if self._n_time_steps > 0:
+            self._store_P(0)
+
+    def _store_P(self, time_i):
+        P = self._conduction_history.get_P()
+        self._set_values("p_0", time_i, "real", P[:, 0])
+        self._set_values("p_1", time_i, "real", P[:, 1])
+
+    def _update_conduction_history(self, time_i):
+        values = self._conduction_values
+        for j, key in enumerate(["T_s0", "T_s1", "q_cd0", "q_cd1"]):
+            values[:, j] = self._get_values(key, time_i, "real")
+        self._conduction_history.push(values)
 
     def _create_ff_matrix(self):
         n = len(self.surfaces)
-        self.ff_matrix = np.zeros((n, n))
-        i = 0
-        for space in self.spaces:
-            n_i = len(space.surfaces)
-            self.ff_matrix[i:i+n_i, i:i + n_i] = space.ff_matrix
-            i += n_i
+        self._sparse = n > self.SPARSE_THRESHOLD
+        if self._sparse:
+            self.ff_matrix = sparse.block_diag(
+                [space.ff_matrix for space in self.spaces], format="csc")
+        else:
+            self.ff_matrix = np.zeros((n, n))
+            i = 0
+            for space in self.spaces:
+                n_i = len(space.surfaces)
+                self.ff_matrix[i:i+n_i, i:i + n_i] = space.ff_matrix
+                i += n_i
 
     def _create_B_matrix(self):
+        # Interior surfaces are twice in the list, one for each side
         n = len(self.surfaces)
-        self.B_matrix = np.zeros((n, n))
+        first_index = {}
+        self.pair_index = np.full(n, -1, dtype=int)
         for i in range(n):
-            for j in range(n):
-                if i != j and self.surfaces[i] == self.surfaces[j]:
-                    self.B_matrix[i][j] = 1
+            j = first_index.setdefault(id(self.surfaces[i]), i)
+            if j != i:
+                self.pair_index[i] = j
+                self.pair_index[j] = i
+        paired = np.flatnonzero(self.pair_index >= 0)
+        self.B_matrix = self._sparse_or_dense_(sparse.csc_matrix(
+            (np.ones(len(paired)), (paired, self.pair_index[paired])), shape=(n, n)))
+
+    # Matrix functions for dense and sparse (more than SPARSE_THRESHOLD surfaces) matrices
+    def _sparse_or_dense_(self, matrix):
+        if self._sparse:
+            return sparse.csc_matrix(matrix)
+        elif sparse.issparse(matrix):
+            return matrix.toarray()
+        else:
+            return np.asarray(matrix)
 
-    def _create_SW_matrices(self):
-        n = len(self.surfaces)
-        self.SWR_matrix = np.identity(n)
-        rho_matrix = np.zeros((n, n))
-        tau_matrix = np.zeros((n, n))
-        alpha_matrix = np.zeros((n, n))
-        area_matrix = np.zeros((n, n))
+    def _diag_matrix_(self, vector):
+        if self._sparse:
+            return sparse.diags(vector, format="csc")
+        else:
+            return np.diag(vector)
 
-        for i in range(n):
-            rho_matrix[i][i] = self.surfaces[i].radiant_property(
-                "rho", "solar_diffuse", self.sides[i])
-            tau_matrix[i][i] = self.surfaces[i].radiant_property(
-                "tau", "solar_diffuse", self.sides[i])
-            # Negative (absortion)
-            alpha_matrix[i][i] = -1 * \
-                self.surfaces[i].radiant_property(
-                    "alpha", "solar_diffuse", self.sides[i])
-            area_matrix[i][i] = self.surfaces[i].area
+    def _factorize_(self, A):
+        if self._sparse:
+            return splu(sparse.csc_matrix(A))
+        else:
+            return lu_factor(A)
 
-        self.SWR_matrix = self.SWR_matrix - \
-            np.matmul(self.ff_matrix, rho_matrix) - \
-            np.matmul(self.ff_matrix, np.matmul(tau_matrix, self.B_matrix))
+    def _factorized_solve_(self, lu, b):
+        if self._sparse:
+            return lu.solve(b)
+        else:
+            return lu_solve(lu, b)
+
+    def _factorized_solve_matrix_(self, lu, X):
+        # A^-1 · X, sparse matrices are solved by blocks of non zero columns
+        if self._sparse:
+            X = sparse.csc_matrix(X)
+            columns = np.flatnonzero(np.diff(X.indptr))
+            rows = []
+            cols = []
+            values = []
+            for j in range(0, len(columns), 256):
+                block = columns[j:j+256]
+                solution = sparse.coo_matrix(lu.solve(X[:, block].toarray()))
+                rows.append(solution.row)
+                cols.append(block[solution.col])
+                values.append(solution.data)
+            if len(columns) == 0:
+                return sparse.csc_matrix(X.shape)
+            return sparse.csc_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=X.shape)
+        else:
+            return lu_solve(lu, X)
 
-        self.SWR_matrix = np.linalg.inv(self.SWR_matrix)
-        aux_matrix = np.matmul(area_matrix, np.matmul(
-            alpha_matrix, self.SWR_matrix))
-        self.SWDIF_matrix = np.matmul(aux_matrix, np.matmul(
-            self.ff_matrix, tau_matrix))  # SW Solar Diffuse
+    def _diag_product_(self, vector, X):
+        # diag(vector) · X
+        if self._sparse:
+            return sparse.diags(vector, format="csc") @ X
+        else:
+            return vector[:, np.newaxis] * X
 
+    def _product_diag_(self, X, vector):
+        # X · diag(vector)
+        if self._sparse:
+            return X @ sparse.diags(vector, format="csc")
+        else:
+            return X * vector[np.newaxis, :]
+
+    def _product_B_(self, X):
+        # X · B_matrix, column j is the column of the other side of interior surface j
+        if self._sparse:
+            return X @ self.B_matrix
+        else:
+            result = np.zeros(X.shape)
+            paired = self.pair_index >= 0
+            result[:, paired] = X[:, self.pair_index[paired]]
+            return result
+
+    def _radiant_vectors_(self, radiation_type):
+        n = len(self.surfaces)
+        rho = np.zeros(n)
+        tau = np.zeros(n)
+        alpha = np.zeros(n)
+        area = np.zeros(n)
+        for i in range(n):
+            rho[i] = self.surfaces[i].radiant_property(
+                "rho", radiation_type, self.sides[i])
+            tau[i] = self.surfaces[i].radiant_property(
+                "tau", radiation_type, self.sides[i])
+            # Negative (absortion)
+            alpha[i] = -1 * self.surfaces[i].radiant_property(
+                "alpha", radiation_type, self.sides[i])
+            area[i] = self.surfaces[i].area
+        return (rho, tau, alpha, area)
+
+    def _create_dist_matrices(self):
+        n = len(self.surfaces)
         m = len(self.spaces)
         dsr_dist_matrix = np.zeros((n, m))
         ig_dist_matrix = np.zeros((n, m))
-        i_glob = 0
-        for j in range(m):
-            for i in range(len(self.spaces[j].surfaces)):
-                dsr_dist_matrix[i_glob][j] = self.spaces[j].dsr_dist_vector[i]
-                ig_dist_matrix[i_glob][j] = self.spaces[j].ig_dist_vector[i]
-                i_glob += 1
-
-        self.SWDIR_matrix = np.matmul(aux_matrix, dsr_dist_matrix)
-        self.SWIG_matrix = np.matmul(aux_matrix, ig_dist_matrix)
+        if n > 0:
+            dsr_dist_matrix[np.arange(n), self.surfaces_space_index] = np.concatenate(
+                [space.dsr_dist_vector for space in self.spaces])
+            ig_dist_matrix[np.arange(n), self.surfaces_space_index] = np.concatenate(
+                [space.ig_dist_vector for space in self.spaces])
+        return (dsr_dist_matrix, ig_dist_matrix)
 
-    def _create_LW_matrices(self):
+    def _create_SW_matrices(self):
         n = len(self.surfaces)
-        self.LWR_matrix = np.identity(n)
-        rho_matrix = np.zeros((n, n))
-        tau_matrix = np.zeros((n, n))
-        alpha_matrix = np.zeros((n, n))
-        area_matrix = np.zeros((n, n))
+        rho, tau, alpha, area = self._radiant_vectors_("solar_diffuse")
 
-        for i in range(n):
-            rho_matrix[i][i] = self.surfaces[i].radiant_property(
-                "rho", "long_wave", self.sides[i])
-            tau_matrix[i][i] = self.surfaces[i].radiant_property(
-                "tau", "long_wave", self.sides[i])
-            # Negative (absortion)
-            alpha_matrix[i][i] = -1 * \
-                self.surfaces[i].radiant_property(
-                    "alpha", "long_wave", self.sides[i])
-            area_matrix[i][i] = self.surfaces[i].area
+        ff_tau_matrix = self._product_diag_(self.ff_matrix, tau)
+        self.SWR_matrix = self._diag_matrix_(np.ones(n)) - \
+            self._product_diag_(self.ff_matrix, rho) - \
+            self._product_B_(ff_tau_matrix)
 
-        self.LWR_matrix = self.LWR_matrix - \
-            np.matmul(self.ff_matrix, rho_matrix) - \
-            np.matmul(self.ff_matrix, np.matmul(tau_matrix, self.B_matrix))
+        # aux = area · alpha · SWR^-1
+        area_alpha = area * alpha
+        SWR_lu = self._factorize_(self.SWR_matrix)
+        self.SWDIF_matrix = self._diag_product_(area_alpha, self._factorized_solve_matrix_(
+            SWR_lu, ff_tau_matrix))  # SW Solar Diffuse
 
-        self.LWR_matrix = np.linalg.inv(self.LWR_matrix)
-        aux_matrix = np.matmul(area_matrix, np.matmul(
-            alpha_matrix, self.LWR_matrix))
-        self.LWEXT_matrix = np.matmul(aux_matrix, np.matmul(
-            self.ff_matrix, tau_matrix))  # Exterior irradiations
+        dsr_dist_matrix, ig_dist_matrix = self._create_dist_matrices()
+        self.SWDIR_matrix = self._diag_product_(area_alpha, self._factorized_solve_matrix_(
+            SWR_lu, dsr_dist_matrix))
+        self.SWIG_matrix = self._diag_product_(area_alpha, self._factorized_solve_matrix_(
+            SWR_lu, ig_dist_matrix))
 
-        m = len(self.spaces)
-        ig_dist_matrix = np.zeros((n, m))
-        i_glob = 0
-        for j in range(m):
-            for i in range(len(self.spaces[j].surfaces)):
-                ig_dist_matrix[i_glob][j] = self.spaces[j].ig_dist_vector[i]
-                i_glob += 1
+    def _create_LW_matrices(self):
+        n = len(self.surfaces)
+        rho, tau, alpha, area = self._radiant_vectors_("long_wave")
+
+        ff_tau_matrix = self._product_diag_(self.ff_matrix, tau)
+        self.LWR_matrix = self._diag_matrix_(np.ones(n)) - \
+            self._product_diag_(self.ff_matrix, rho) - \
+            self._product_B_(ff_tau_matrix)
+
+        # aux = area · alpha · LWR^-1
+        area_alpha = area * alpha
+        LWR_lu = self._factorize_(self.LWR_matrix)
+        self.LWEXT_matrix = self._diag_product_(area_alpha, self._factorized_solve_matrix_(
+            LWR_lu, ff_tau_matrix))  # Exterior irradiations
 
-        self.LWIG_matrix = np.matmul(aux_matrix, ig_dist_matrix)
+        dsr_dist_matrix, ig_dist_matrix = self._create_dist_matrices()
+        self.LWIG_matrix = self._diag_product_(area_alpha, self._factorized_solve_matrix_(
+            LWR_lu, ig_dist_matrix))
 
         # Temperature matrix
-        self.KTEMP_matrix = np.matmul(area_matrix, -1 * alpha_matrix) - \
-            np.matmul(aux_matrix, np.matmul(self.ff_matrix, alpha_matrix))
+        self.KTEMP_matrix = self._diag_matrix_(area * (-1 * alpha)) - \
+            self._diag_product_(area_alpha, self._factorized_solve_matrix_(
+                LWR_lu, self._product_diag_(self.ff_matrix, alpha)))
 
         H_RD = 5.705  # 4*sigma*(293^3)
         self.KTEMP_matrix = H_RD * self.KTEMP_matrix
@@ -175,73 +403,59 @@ class Building(Component):
     def _create_K_matrices(self):
         n = len(self.surfaces)
         m = len(self.spaces)
-        self.KS_matrix = np.copy(-self.KTEMP_matrix)
-        self.KSZ_matrix = np.zeros((n, m))
-        self.KZ_matrix = np.zeros((m, m))
+        KS_diagonal = np.zeros(n)
+        KS_interior = np.zeros(n)  # k_01 of the interior surfaces, coupled with the other side
+        KSZ_vector = np.zeros(n)  # Convection with the space of each surface
+        self._k_0 = np.ones(n)
+        self._k_01 = np.zeros(n)
 
         # KS_matriz, KSZ_matrix
         for i in range(n):
-            s_type = self.surfaces[i].parameter("type").value
+            s_type = self.surfaces_type[i]
 
-            if s_type == "Exterior_surface":
-                k = self.surfaces[i].k
-                k_01 = self.surfaces[i].k_01
-                self.KS_matrix[i][i] += k[1] - (k_01**2)/k[0]
-                for j in range(m):
-                    if self.spaces[j] == self.surfaces[i].parameter("space").component:
-                        self.KSZ_matrix[i][j] = self.surfaces[i].area * \
-                            self.surfaces[i].parameter(
-                                "h_cv").value[self.sides[i]]
-            elif s_type == "Underground_surface":
-                k = self.surfaces[i].k
-                k_01 = self.surfaces[i].k_01
-                self.KS_matrix[i][i] += k[1]
-                for j in range(m):
-                    if self.spaces[j] == self.surfaces[i].parameter("space").component:
-                        self.KSZ_matrix[i][j] = self.surfaces[i].area * \
-                            self.surfaces[i].parameter("h_cv").value
-            elif s_type == "Interior_surface":
-                k = self.surfaces[i].k
-                k_01 = self.surfaces[i].k_01
-                self.KS_matrix[i][i] += k[self.sides[i]]
-                for j in range(n):
-                    if self.B_matrix[i][j] == 1:
-                        self.KS_matrix[i][j] += k_01
-                for j in range(m):
-                    if self.spaces[j] == self.surfaces[i].parameter("spaces").component[self.sides[i]]:
-                        self.KSZ_matrix[i][j] = self.surfaces[i].area * \
-                            self.surfaces[i].parameter(
-                                "h_cv").value[self.sides[i]]
-            elif s_type == "Virtual_exterior_surface":
-                self.KS_matrix[i][i] += 1.0
-                for j in range(m):
-                    if self.spaces[j] == self.surfaces[i].parameter("space").component:
-                        self.KSZ_matrix[i][j] = 0
-            elif s_type == "Virtual_interior_surface":
-                self.KS_matrix[i][i] += 1.0
-                for j in range(m):
-                    if self.spaces[j] == self.surfaces[i].parameter("spaces").component[self.sides[i]]:
-                        self.KSZ_matrix[i][j] = 0
-            elif s_type == "Opening":
+            if s_type == EXTERIOR or s_type == OPENING:
                 k = self.surfaces[i].k
                 k_01 = self.surfaces[i].k_01
-                self.KS_matrix[i][i] += k[1] - (k_01**2)/k[0]
-                for j in range(m):
-                    if self.spaces[j] == self.surfaces[i].parameter("surface").component.parameter("space").component:
-                        self.KSZ_matrix[i][j] = self.surfaces[i].area * \
-                            self.surfaces[i].parameter(
-                                "h_cv").value[self.sides[i]]
-
-        self.KS_inv_matrix = np.linalg.inv(self.KS_matrix)
+                KS_diagonal[i] = k[1] - (k_01**2)/k[0]
+                KSZ_vector[i] = self.surfaces[i].area * \
+                    self.surfaces[i].parameter("h_cv").value[self.sides[i]]
+            elif s_type == UNDERGROUND:
+                KS_diagonal[i] = self.surfaces[i].k[1]
+                KSZ_vector[i] = self.surfaces[i].area * \
+                    self.surfaces[i].parameter("h_cv").value
+            elif s_type == INTERIOR:
+                KS_diagonal[i] = self.surfaces[i].k[self.sides[i]]
+                KS_interior[i] = self.surfaces[i].k_01
+                KSZ_vector[i] = self.surfaces[i].area * \
+                    self.surfaces[i].parameter("h_cv").value[self.sides[i]]
+            elif s_type == VIRTUAL_EXTERIOR or s_type == VIRTUAL_INTERIOR:
+                KS_diagonal[i] = 1.0
+            # k_0, k_01 used in FS vector
+            if s_type == EXTERIOR or s_type == OPENING or s_type == UNDERGROUND:
+                self._k_0[i] = self.surfaces[i].k[0]
+                self._k_01[i] = self.surfaces[i].k_01
+
+        self.KS_matrix = -self.KTEMP_matrix + self._diag_matrix_(KS_diagonal) + \
+            self._diag_product_(KS_interior, self.B_matrix)
+        self.KS_lu = self._factorize_(self.KS_matrix)
+        self.KSZ_matrix = np.zeros((n, m))
+        self.KSZ_matrix[np.arange(n), self.surfaces_space_index] = KSZ_vector
 
         # KZ_matrix without air movement
+        self._capacity = np.zeros(m)
         for i in range(m):
-            self.KZ_matrix[i][i] = (self.spaces[i].parameter("volume").value * self.RHO * self.C_P + self.spaces[i].parameter(
-                "furniture_weight").value * self.C_P_FURNITURE) / self.project().parameter("time_step").value
-            for j in range(n):
-                self.KZ_matrix[i][i] += self.KSZ_matrix[j][i]
+            self._capacity[i] = self.spaces[i].parameter("volume").value * self.RHO * self.C_P + \
+                self.spaces[i].parameter("furniture_weight").value * self.C_P_FURNITURE
+        self.KZ_matrix = np.diag(self._capacity / self.project().parameter("time_step").value +
+                                 self.KSZ_matrix.sum(axis=0))
         # KZS
         self.KZS_matrix = -1 * self.KSZ_matrix.transpose()
+        # Constant products: KS_inv·KSZ and Schur complement KZS·KS_inv·KSZ
+        self.KS_inv_KSZ_matrix = self._factorized_solve_(
+            self.KS_lu, self.KSZ_matrix)
+        self.KSCHUR_matrix = np.matmul(
+            self.KZS_matrix, self.KS_inv_KSZ_matrix)
+        self._infiltration = None
 
     def pre_iteration(self, time_index, date, daylight_saving):
         super().pre_iteration(time_index, date, daylight_saving)
@@ -254,273 +468,231 @@ class Building(Component):
         self._calculate_FZ_vector(time_index)
         self._update_K_matrices(time_index)
         self._calculate_FINAL_matrices(time_index)
-        self.TZ_vector = np.matmul(self.KFIN_inv_matrix, self.FFIN_vector)
+        self.TZ_vector = lu_solve(self.KFIN_lu, self.FFIN_vector)
+        self._settled = None
 
     def _calculate_Q_dir(self, time_i):
-        E_dir = np.zeros(len(self.spaces))
-        for i in range(len(self.spaces)):
-            E_dir[i] = self.spaces[i].variable(
-                "solar_direct_gains").values[time_i]
-        self.Q_dir = np.matmul(self.SWDIR_matrix, E_dir)
+        E_dir = self._get_values("solar_direct_gains", time_i, "spaces")
+        self.Q_dir = self.SWDIR_matrix @ E_dir
 
     def _calculate_Q_igsw(self, time_i):
-        E_ig = np.zeros(len(self.spaces))
-        for i in range(len(self.spaces)):
-            E_ig[i] = self.spaces[i].variable("light_radiant").values[time_i]
-        self.Q_igsw = np.matmul(self.SWIG_matrix, E_ig)
+        E_ig = self._get_values("light_radiant", time_i, "spaces")
+        self.Q_igsw = self.SWIG_matrix @ E_ig
 
     def _calculate_Q_iglw(self, time_i):
-        E_ig = np.zeros(len(self.spaces))
-        for i in range(len(self.spaces)):
-            E_ig[i] = self.spaces[i].variable(
-                "people_radiant").values[time_i] + self.spaces[i].variable("other_gains_radiant").values[time_i]
-        self.Q_iglw = np.matmul(self.LWIG_matrix, E_ig)
+        E_ig = self._get_values("people_radiant", time_i, "spaces") + \
+            self._get_values("other_gains_radiant", time_i, "spaces")
+        self.Q_iglw = self.LWIG_matrix @ E_ig
 
     def _calculate_Q_dif(self, time_i):
         E_dif = np.zeros(len(self.surfaces))
-        for i in range(len(self.surfaces)):
-            s_type = self.surfaces[i].parameter("type").value
-            if s_type == "Opening" or s_type == "Exterior_surface" or s_type == "Virtual_exterior_surface":
-                E_dif[i] = self.surfaces[i].variable("E_dif").values[time_i]
-        self.Q_dif = np.matmul(self.SWDIF_matrix, E_dif)
+        index = self._index["E_dif"]
+        E_dif[index] = self._get_values("E_dif", time_i, "E_dif")
+        self.Q_dif = self.SWDIF_matrix @ E_dif
 
     def _calculate_Q_extlw(self, time_i):
         E_ext = np.zeros(len(self.surfaces))
-        for i in range(len(self.surfaces)):
-            s_type = self.surfaces[i].parameter("type").value
-            if s_type == "Virtual_exterior_surface":
-                E_ext[i] = 5.56E-8 * \
-                    (self.surfaces[i].variable("T_rm").values[time_i]**4)
-        self.Q_extlw = np.matmul(self.LWEXT_matrix, E_ext)
+        index = self._index[VIRTUAL_EXTERIOR]
+        E_ext[index] = 5.56E-8 * \
+            (self._get_values("T_rm", time_i, VIRTUAL_EXTERIOR)**4)
+        self.Q_extlw = self.LWEXT_matrix @ E_ext
 
     def _calculate_FS_vector(self, time_i):
         n = len(self.surfaces)
         self.FS_vector = np.zeros(n)
-
-        for i in range(n):
-            Q_rad = -(self.Q_dir[i] + self.Q_dif[i] +
-                      self.Q_igsw[i] + self.Q_iglw[i] + self.Q_extlw[i])  # positive surface incoming
-            s_type = self.surfaces[i].parameter("type").value
-            area = self.surfaces[i].area
-            if s_type == "Exterior_surface":
-                self.surfaces[i].variable("q_sol1").values[time_i] = - (
-                    self.Q_dir[i] + self.Q_dif[i])/area
-                self.surfaces[i].variable(
-                    "q_swig1").values[time_i] = - self.Q_igsw[i]/area
-                self.surfaces[i].variable("q_lwig1").values[time_i] = - (
-                    self.Q_iglw[i] + self.Q_extlw[i])/area
-                f = -self.surfaces[i].area * self.surfaces[i].variable(
-                    "p_1").values[time_i] - Q_rad - self.surfaces[i].f_0 * self.surfaces[i].k_01 / self.surfaces[i].k[0]
-                self.FS_vector[i] = f
-                self.surfaces[i].variable("debug_f").values[time_i] = f
-            elif s_type == "Underground_surface":
-                self.surfaces[i].variable("q_sol1").values[time_i] = - (
-                    self.Q_dir[i] + self.Q_dif[i])/area
-                self.surfaces[i].variable(
-                    "q_swig1").values[time_i] = - self.Q_igsw[i]/area
-                self.surfaces[i].variable("q_lwig1").values[time_i] = - (
-                    self.Q_iglw[i] + self.Q_extlw[i])/area
-                f = -self.surfaces[i].area * self.surfaces[i].variable(
-                    "p_1").values[time_i] - Q_rad - self.surfaces[i].k_01 * self.surfaces[i].variable("T_s0").values[time_i]
-                self.FS_vector[i] = f
-                self.surfaces[i].variable("debug_f").values[time_i] = f
-            elif s_type == "Interior_surface":
-                if self.sides[i] == 0:
-                    self.surfaces[i].variable("q_sol0").values[time_i] = - (
-                        self.Q_dir[i] + self.Q_dif[i])/area
-                    self.surfaces[i].variable(
-                        "q_swig0").values[time_i] = - self.Q_igsw[i]/area
-                    self.surfaces[i].variable("q_lwig0").values[time_i] = - (
-                        self.Q_iglw[i] + self.Q_extlw[i])/area
-                    f = -self.surfaces[i].area * \
-                        self.surfaces[i].variable("p_0").values[time_i] - Q_rad
-                    self.FS_vector[i] = f
-                    self.surfaces[i].variable("debug_f0").values[time_i] = f
-                else:
-                    self.surfaces[i].variable("q_sol1").values[time_i] = - (
-                        self.Q_dir[i] + self.Q_dif[i])/area
-                    self.surfaces[i].variable(
-                        "q_swig1").values[time_i] = - self.Q_igsw[i]/area
-                    self.surfaces[i].variable("q_lwig1").values[time_i] = - (
-                        self.Q_iglw[i] + self.Q_extlw[i])/area
-                    f = -self.surfaces[i].area * \
-                        self.surfaces[i].variable("p_1").values[time_i] - Q_rad
-                    self.FS_vector[i] = f
-                    self.surfaces[i].variable("debug_f1").values[time_i] = f
-            elif s_type == "Virtual_exterior_surface" or s_type == "Virtual_interior_surface":
-                self.FS_vector[i] = 0.0
-            elif s_type == "Opening":
-                q_sol_10 = -(self.Q_dir[i] + self.Q_dif[i])/area
-                E_sol_int = q_sol_10 / \
-                    self.surfaces[i].radiant_property(
-                        "alpha", "solar_diffuse", 1)
-                E_swig_int = - \
-                    self.Q_igsw[i]/(area*self.surfaces[i].radiant_property(
-                        "alpha", "solar_diffuse", 1))
-                self.surfaces[i].variable("E_ref").values[time_i] = E_sol_int
-                self.surfaces[i].variable("E_ref_tra").values[time_i] = E_sol_int * \
-                    self.surfaces[i].radiant_property(
-                        "tau", "solar_diffuse", 1)
-                self.surfaces[i].variable("q_sol1").values[time_i] += q_sol_10
-                self.surfaces[i].variable("q_sol0").values[time_i] += E_sol_int * \
-                    self.surfaces[i].radiant_property(
-                        "alpha_other_side", "solar_diffuse", 1)
-                self.surfaces[i].variable(
-                    "q_swig1").values[time_i] = -self.Q_igsw[i]/area
-                self.surfaces[i].variable("q_swig0").values[time_i] = E_swig_int * \
-                    self.surfaces[i].radiant_property(
-                        "alpha_other_side", "solar_diffuse", 1)
-                self.surfaces[i].variable(
-                    "q_lwig1").values[time_i] = -(self.Q_iglw[i] + self.Q_extlw[i])/area
-                f_0 = self.surfaces[i].f_0 - (self.surfaces[i].variable(
-                    "q_sol0").values[time_i] + self.surfaces[i].variable("q_swig0").values[time_i]) * area
-                f = - Q_rad - (self.surfaces[i].variable(
-                    "q_sol1").values[time_i]-q_sol_10) * area - f_0 * self.surfaces[i].k_01 / self.surfaces[i].k[0]
-                self.FS_vector[i] = f
-                self.surfaces[i].variable("debug_f").values[time_i] = f
+        area = self.area_vector
+        # positive surface incoming
+        Q_rad = -(self.Q_dir + self.Q_dif +
+                  self.Q_igsw + self.Q_iglw + self.Q_extlw)
+        q_sol = -(self.Q_dir + self.Q_dif)/area
+        q_swig = -self.Q_igsw/area
+        q_lwig = -(self.Q_iglw + self.Q_extlw)/area
+
+        # Exterior, underground and interior (side 1)
+        i = self._index["opaque_1"]
+        self._set_values("q_sol1", time_i, "opaque_1", q_sol[i])
+        self._set_values("q_swig1", time_i, "opaque_1", q_swig[i])
+        self._set_values("q_lwig1", time_i, "opaque_1", q_lwig[i])
+
+        i = self._index[EXTERIOR]
+        f = -area[i] * self._get_values("p_1", time_i, EXTERIOR) - Q_rad[i] - \
+            self._get_values("f_0", time_i, EXTERIOR) * self._k_01[i] / self._k_0[i]
+        self.FS_vector[i] = f
+        self._set_values("debug_f", time_i, EXTERIOR, f)
+
+        i = self._index[UNDERGROUND]
+        f = -area[i] * self._get_values("p_1", time_i, UNDERGROUND) - Q_rad[i] - \
+            self._k_01[i] * self._get_values("T_s0", time_i, UNDERGROUND)
+        self.FS_vector[i] = f
+        self._set_values("debug_f", time_i, UNDERGROUND, f)
+
+        # Interior side 0
+        i = self._index["interior_0"]
+        self._set_values("q_sol0", time_i, "interior_0", q_sol[i])
+        self._set_values("q_swig0", time_i, "interior_0", q_swig[i])
+        self._set_values("q_lwig0", time_i, "interior_0", q_lwig[i])
+        f = -area[i] * self._get_values("p_0", time_i, "interior_0") - Q_rad[i]
+        self.FS_vector[i] = f
+        self._set_values("debug_f0", time_i, "interior_0", f)
+
+        # Interior side 1
+        i = self._index["interior_1"]
+        f = -area[i] * self._get_values("p_1", time_i, "interior_1") - Q_rad[i]
+        self.FS_vector[i] = f
+        self._set_values("debug_f1", time_i, "interior_1", f)
+
+        # Openings
+        i = self._index[OPENING]
+        q_sol_10 = q_sol[i]
+        E_sol_int = q_sol_10 / self._opening_alpha
+        E_swig_int = q_swig[i] / self._opening_alpha
+        self._set_values("E_ref", time_i, OPENING, E_sol_int)
+        self._set_values("E_ref_tra", time_i, OPENING, E_sol_int * self._opening_tau)
+        q_sol1 = self._get_values("q_sol1", time_i, OPENING) + q_sol_10
+        q_sol0 = self._get_values("q_sol0", time_i, OPENING) + \
+            E_sol_int * self._opening_alpha_other
+        q_swig0 = E_swig_int * self._opening_alpha_other
+        self._set_values("q_sol1", time_i, OPENING, q_sol1)
+        self._set_values("q_sol0", time_i, OPENING, q_sol0)
+        self._set_values("q_swig1", time_i, OPENING, q_swig[i])
+        self._set_values("q_swig0", time_i, OPENING, q_swig0)
+        self._set_values("q_lwig1", time_i, OPENING, q_lwig[i])
+        f_0 = self._get_values("f_0", time_i, OPENING) - (q_sol0 + q_swig0) * area[i]
+        f = - Q_rad[i] - (q_sol1 - q_sol_10) * area[i] - \
+            f_0 * self._k_01[i] / self._k_0[i]
+        self.FS_vector[i] = f
+        self._set_values("debug_f", time_i, OPENING, f)
+        # Virtual surfaces: FS = 0
 
     def _calculate_FZ_vector(self, time_i):
         m = len(self.spaces)
-        self.FZ_vector = np.zeros(m)
         self.PZ_vector = np.zeros(m)  # Perfect conditioning loads
-
-        for i in range(m):
-            if time_i == 0:
-                T_pre = self.parameter("initial_temperature").value
-            else:
-                T_pre = self.spaces[i].variable("temperature").values[time_i-1]
-            self.FZ_vector[i] = self.spaces[i].variable("people_convective").values[time_i] + self.spaces[i].variable(
-                "other_gains_convective").values[time_i] + self.spaces[i].variable("light_convective").values[time_i]
-            self.FZ_vector[i] += (self.spaces[i].parameter("volume").value * self.RHO * self.C_P + self.spaces[i].parameter(
-                "furniture_weight").value * self.C_P_FURNITURE) * T_pre / self.project().parameter("time_step").value
-            self.FZ_vector[i] += self.spaces[i].variable("infiltration_flow").values[time_i] * \
-                self.RHO*self.C_P * \
-                self._file_met.variable("temperature").values[time_i]
+        if time_i == 0:
+            T_pre = np.full(m, self.parameter("initial_temperature").value)
+        else:
+            T_pre = self._get_values("temperature", time_i - 1, "spaces")
+        self.FZ_vector = self._get_values("people_convective", time_i, "spaces") + \
+            self._get_values("other_gains_convective", time_i, "spaces") + \
+            self._get_values("light_convective", time_i, "spaces")
+        self.FZ_vector += self._capacity * T_pre / \
+            self.project().parameter("time_step").value
+        self.FZ_vector += self._get_values("infiltration_flow", time_i, "spaces") * \
+            self.RHO*self.C_P * \
+            self._file_met.variable("temperature").values[time_i]
 
     def _update_K_matrices(self, time_i):
         m = len(self.spaces)
-        self.KZFIN_matrix = self.KZ_matrix.copy()
-
-        # Add infiltration
-        for i in range(m):
-            self.KZFIN_matrix[i][i] += self.spaces[i].variable(
-                "infiltration_flow").values[time_i]*self.RHO*self.C_P
+        infiltration = self._get_values("infiltration_flow", time_i, "spaces")
+        # Only infiltration changes, factorize again if it is different
+        if self._infiltration is None or not np.array_equal(infiltration, self._infiltration):
+            self._infiltration = infiltration
+            self.KZFIN_matrix = self.KZ_matrix.copy()
+            # Add infiltration
+            for i in range(m):
+                self.KZFIN_matrix[i][i] += infiltration[i]*self.RHO*self.C_P
+            self.KFIN_matrix = self.KZFIN_matrix - self.KSCHUR_matrix
+            self.KFIN_lu = lu_factor(self.KFIN_matrix)
 
     def _calculate_FINAL_matrices(self, time_i):
-        self.KFIN_matrix = self.KZFIN_matrix - \
-            np.matmul(self.KZS_matrix, np.matmul(
-                self.KS_inv_matrix, self.KSZ_matrix))
-        self.KFIN_inv_matrix = np.linalg.inv(self.KFIN_matrix)
+        self.KS_inv_FS_vector = self._factorized_solve_(
+            self.KS_lu, self.FS_vector)
         self.FFIN_vector = self.FZ_vector - \
-            np.matmul(self.KZS_matrix, np.matmul(
-                self.KS_inv_matrix, self.FS_vector))
+            np.matmul(self.KZS_matrix, self.KS_inv_FS_vector)
 
     def iteration(self, time_index, date, daylight_saving):
         super().iteration(time_index, date, daylight_saving)
-        # Comprobar convergencia
-        converged = self._converged(time_index)
-        if converged:
+        # The solution only depends on pre_iteration values, it is not repeated in the next iterations
+        if self._settled is None:
+            self._settled = self._calculate_T_P(time_index)
             self._store_spaces_values(time_index)
             self._store_surfaces_values(time_index)
-        else:
-            self._calculate_T_P(time_index)
-        return converged
-
-    def _converged(self, time_i):
-        for i in range(len(self.spaces)):
-            heat_on, heat_sp = self.spaces[i].perfect_heating(time_i)
-            cool_on, cool_sp = self.spaces[i].perfect_cooling(time_i)
-            if heat_on and self.TZ_vector[i] < heat_sp:
-                return False
-            if cool_on and self.TZ_vector[i] > cool_sp:
-                return False
-        return True
+            if not self._settled:
+                if self._n_not_settled == 0:
+                    self.project().print(
+                        f"Warning: {self.parameter('name').value}, perfect conditioning does not converge in time step {time_index}, n_max_iteration reached.")
+                self._n_not_settled += 1
+        return self._settled
+
+    def post_simulation(self):
+        super().post_simulation()
+        if self._n_not_settled > 0:
+            self.project().print(
+                f"Warning: {self.parameter('name').value}, perfect conditioning does not converge in {self._n_not_settled} time steps.")
 
     def _calculate_T_P(self, time_i):
-        # T del espacio 0 -9999 si desconocida
-        unknown_T = []
-        n_unknown_T = 0
-        for i in range(len(self.spaces)):
-            heat_on, heat_sp = self.spaces[i].perfect_heating(time_i)
-            cool_on, cool_sp = self.spaces[i].perfect_cooling(time_i)
-            unknown_T.append(True)
-            n_unknown_T += 1
-            if heat_on and self.TZ_vector[i] < heat_sp:
-                unknown_T[i] = False
-                self.TZ_vector[i] = heat_sp
-                n_unknown_T -= 1
-            if cool_on and self.TZ_vector[i] > cool_sp:
-                unknown_T[i] = False
-                self.TZ_vector[i] = cool_sp
-                n_unknown_T -= 1
-        if n_unknown_T > 0:
-            K = np.zeros((n_unknown_T, n_unknown_T))
-            F = np.zeros(n_unknown_T)
-            i0 = 0
-            j0 = 0
-            for i in range(len(self.spaces)):
-                if unknown_T[i]:
-                    F[i0] = self.FFIN_vector[i]
-                    for j in range(len(self.spaces)):
-                        if unknown_T:
-                            K[i0][j0] = self.KFIN_matrix[i][j]
-                            j0 += 1
-                        else:
-                            F[i0] -= self.KFIN_matrix[i][j]*self.TZ_vector[j]
-                    i0 += 1
-
-            T = np.linalg.solve(K, F)
-            i0 = 0
-            for i in range(len(self.spaces)):
-                if unknown_T[i]:
-                    self.TZ_vector[i] = T[i0]
-                    i0 += 1
-
-        # Calculate P
-        for i in range(len(self.spaces)):
-            if unknown_T[i]:
-                self.PZ_vector[i] = 0
-            else:
-                self.PZ_vector[i] = - self.FFIN_vector[i]
-                for j in range(len(self.spaces)):
-                    self.PZ_vector[i] += self.KFIN_matrix[i][j] * \
-                        self.TZ_vector[j]
+        # Active set solution of the perfect conditioning: each space is free (P = 0) or
+        # at the heating (P > 0) or cooling (P < 0) setpoint. Returns False if the active set
+        # does not settle in n_max_iteration solutions (at least one clamp solution is done)
+        m = len(self.spaces)
+        heat_on = np.zeros(m, dtype=bool)
+        cool_on = np.zeros(m, dtype=bool)
+        heat_sp = np.zeros(m)
+        cool_sp = np.zeros(m)
+        for i in range(m):
+            heat_on[i], heat_sp[i] = self.spaces[i].perfect_heating(time_i)
+            cool_on[i], cool_sp[i] = self.spaces[i].perfect_cooling(time_i)
+
+        state = np.zeros(m, dtype=int)  # 0: free, 1: heating, -1: cooling
+        T = self.TZ_vector
+        P = np.zeros(m)
+        n_iter = 1  # Free floating solution
+        n_max = max(self.project().parameter("n_max_iteration").value, 2)
+        settled = False
+        while True:
+            free = state == 0
+            heat = free & heat_on & (T < heat_sp)
+            cool = free & cool_on & (T > cool_sp)
+            release = ((state == 1) & (P < 0)) | ((state == -1) & (P > 0))
+            if not (np.any(heat) or np.any(cool) or np.any(release)):
+                settled = True
+                break
+            if n_iter >= n_max:
+                break
+            state[heat] = 1
+            state[cool] = -1
+            state[release] = 0
+            free = state == 0
+            T = np.where(state == 1, heat_sp, cool_sp)
+            if np.any(free):
+                fixed = ~free
+                F = self.FFIN_vector[free] - \
+                    np.matmul(self.KFIN_matrix[np.ix_(free, fixed)], T[fixed])
+                T[free] = np.linalg.solve(
+                    self.KFIN_matrix[np.ix_(free, free)], F)
+            P = np.where(free, 0.0, np.matmul(
+                self.KFIN_matrix, T) - self.FFIN_vector)
+            n_iter += 1
+        self.TZ_vector = T
+        self.PZ_vector = P
+        self.variable("n_iterations").values[time_i] = n_iter
+        return settled
 
     def _store_spaces_values(self, time_i):
         # Store TZ y PZ
-        for i in range(len(self.spaces)):
-            self.spaces[i].variable(
-                "temperature").values[time_i] = self.TZ_vector[i]
-
-            self.spaces[i].variable("Q_heating").values[time_i] = 0
-            self.spaces[i].variable("Q_cooling").values[time_i] = 0
-
-            if self.PZ_vector[i] > 0:
-                self.spaces[i].variable(
-                    "Q_heating").values[time_i] = self.PZ_vector[i]
-            elif self.PZ_vector[i] < 0:
-                self.spaces[i].variable(
-                    "Q_cooling").values[time_i] = - self.PZ_vector[i]
+        P = self.PZ_vector
+        self._set_values("temperature", time_i, "spaces", self.TZ_vector)
+        self._set_values("Q_heating", time_i, "spaces", np.where(P > 0, P, 0.0))
+        self._set_values("Q_cooling", time_i, "spaces", np.where(P < 0, -P, 0.0))
 
         # Calculate hunmidity balance ??
 
     def _store_surfaces_values(self, time_i):
         # Calculate TS,
-        self.TS_vector = np.matmul(self.KS_inv_matrix, self.FS_vector) - np.matmul(
-            self.KS_inv_matrix, np.matmul(self.KSZ_matrix, self.TZ_vector))
+        self.TS_vector = self.KS_inv_FS_vector - \
+            np.matmul(self.KS_inv_KSZ_matrix, self.TZ_vector)
         # Store TS
-        for i in range(len(self.surfaces)):
-            if not self.surfaces[i].is_virtual():
-                if (self.sides[i] == 0):
-                    self.surfaces[i].variable(
-                        "T_s0").values[time_i] = self.TS_vector[i]
-                else:
-                    self.surfaces[i].variable(
-                        "T_s1").values[time_i] = self.TS_vector[i]
+        i = self._index["T_s0"]
+        self._set_values("T_s0", time_i, "T_s0", self.TS_vector[i])
+        i = self._index["T_s1"]
+        self._set_values("T_s1", time_i, "T_s1", self.TS_vector[i])
 
     def post_iteration(self, time_index, date, daylight_saving, converged):
         super().post_iteration(time_index, date, daylight_saving, converged)
         # When not converged .... ?
+        # Surfaces heat fluxes are calculated in their post_iteration, P for the next time step
+        self._update_conduction_history(time_index)
+        if time_index + 1 < self._n_time_steps:
+            self._store_P(time_index + 1)
 
     def draw_pyvista(self, opacity=1, coordinate_system="building", space="all"):
         self._create_spaces_surfaces_list()
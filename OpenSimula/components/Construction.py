@@ -3,6 +3,70 @@ import numpy as np
 from scipy.optimize import brentq
 from OpenSimula.Parameters import Parameter_component_list, Parameter_float_list
 from OpenSimula.Component import Component
+from OpenSimula.Disk_cache import Disk_cache
+
+# Divisions of the mean spacing of the transfer function roots for the root scan
+_ROOTS_SCAN_DIVISIONS_ = 32
+# Transfer function coefficients by (layers, delta_t), in memory and cached on disk
+_trans_fun_memo_ = {}
+_TRANS_FUN_VERSION_ = 1
+_trans_fun_cache_ = Disk_cache("construction", max_size=20 * 1024 * 1024)
+
+
+class Conduction_history():
+    """Last values of surface temperatures and conduction heat fluxes of a group of surfaces
+    used to calculate p_0 and p_1 with the construction transfer functions of each surface.
+
+    The coefficients of all the surfaces are padded with zeros to the longest history.
+    The values are stored twice in a ring buffer (one row for each time step), so the
+    last values are always a contiguous window and p_0, p_1 of all the surfaces are
+    one batched matrix vector product.
+    """
+
+    def __init__(self, constructions, T_ini):
+        """
+        Args:
+            constructions (list): Construction of each surface
+            T_ini (float): Temperature of the surfaces before the first time step
+        """
+        n_s = len(constructions)
+        self._n_ = 0
+        for construction in constructions:
+            self._n_ = max(self._n_, construction.n_history())
+        # Time step major order: (n_surfaces, 2, n_history * 4)
+        self._coefficients_ = np.zeros((n_s, 2, self._n_, 4))
+        initial = np.zeros((n_s, self._n_, 4))
+        for i in range(n_s):
+            n_i = constructions[i].n_history()
+            self._coefficients_[i, :, 0:n_i, :] = constructions[i].get_P_coefficients(
+            ).transpose(0, 2, 1)
+            initial[i] = constructions[i].initial_history(T_ini, self._n_).T
+        self._coefficients_ = self._coefficients_.reshape(
+            n_s, 2, 4 * self._n_)
+        self._buffer_ = np.concatenate((initial, initial), axis=1)
+        self._position_ = 0
+
+    def get_P(self):
+        """
+            Conduction P for the current time step
+        Returns:
+            numpy array (n_surfaces, 2): p_0 and p_1 of each surface
+        """
+        n_s = len(self._buffer_)
+        history = self._buffer_[:, self._position_:self._position_+self._n_].reshape(
+            n_s, 4 * self._n_, 1)
+        return np.matmul(self._coefficients_, history)[:, :, 0]
+
+    def push(self, values):
+        """Add the values of the current time step
+
+        Args:
+            values (numpy array (n_surfaces, 4)): T_s0, T_s1, q_cd0, q_cd1 of each surface
+        """
+        if self._n_ > 0:
+            self._position_ = (self._position_ - 1) % self._n_
+            self._buffer_[:, self._position_] = values
+            self._buffer_[:, self._position_ + self._n_] = values
 
 
 class Construction(Component):
@@ -104,29 +168,55 @@ class Construction(Component):
         Returns:
             (p_0, p_1): 
         """
-        p0 = 0
-        p1 = 0
-        for i in range(1, len(self._coef_T_a)):
-            j = time_i - i
-            if j < 0:
-                T_0 = T_ini
-                T_1 = T_ini
-            else:
-                T_0 = T_s0[j]
-                T_1 = T_s1[j]
-            p0 += -self._coef_T_c[i] * T_0 + self._coef_T_b[i] * T_1
-            p1 += -self._coef_T_a[i] * T_1 + self._coef_T_b[i] * T_0
-        for i in range(1, len(self._coef_Q)):
-            j = time_i - i
-            if j < 0:
-                q_0 = 0
-                q_1 = 0
-            else:
-                q_0 = q_cd0[j]
-                q_1 = q_cd1[j]
-            p0 += -self._coef_Q[i] * q_0
-            p1 += -self._coef_Q[i] * q_1
-        return (p0, p1)
+        history = self.initial_history(T_ini)
+        k = min(time_i, history.shape[1])
+        if k > 0:
+            # Most recent first
+            history[0, 0:k] = T_s0[time_i-1::-1][0:k]
+            history[1, 0:k] = T_s1[time_i-1::-1][0:k]
+            history[2, 0:k] = q_cd0[time_i-1::-1][0:k]
+            history[3, 0:k] = q_cd1[time_i-1::-1][0:k]
+        p = self.get_P_coefficients().reshape(2, -1) @ history.ravel()
+        return (p[0], p[1])
+
+    def n_history(self):
+        """
+            Number of previous time steps used by the transfer functions
+        """
+        return max(len(self._coef_T_a), len(self._coef_Q)) - 1
+
+    def initial_history(self, T_ini, n=None):
+        """
+            History before the first time step, rows: T_s0, T_s1, q_cd0, q_cd1, most recent first
+        Args:
+            T_ini (float): Temperature before the first time step
+            n (int, optional): Number of time steps, n_history by default
+        Returns:
+            numpy array (4, n): 
+        """
+        if n is None:
+            n = self.n_history()
+        history = np.zeros((4, n))
+        history[0:2, :] = T_ini
+        return history
+
+    def get_P_coefficients(self):
+        """
+            Coefficients of the history for p_0 and p_1: p_i = sum(coefficients[i] * history)
+        Returns:
+            numpy array (2, 4, n_history): 
+        """
+        n = self.n_history()
+        coef = np.zeros((2, 4, n))
+        n_t = len(self._coef_T_a) - 1
+        n_q = len(self._coef_Q) - 1
+        coef[0, 0, 0:n_t] = -self._coef_T_c[1:]
+        coef[0, 1, 0:n_t] = self._coef_T_b[1:]
+        coef[0, 2, 0:n_q] = -self._coef_Q[1:]
+        coef[1, 1, 0:n_t] = -self._coef_T_a[1:]
+        coef[1, 0, 0:n_t] = self._coef_T_b[1:]
+        coef[1, 3, 0:n_q] = -self._coef_Q[1:]
+        return coef
 
     def _resis_layer_(self, layer):
         material = self.parameter("materials").component[layer]
@@ -175,22 +265,6 @@ class Construction(Component):
             C = -aux * math.sin(aux) / resis
         return np.array([[A, B], [C, A]])
 
-    def _dH_Matrix_Layer_(self, s, layer):
-        # Calculate dif H Matrix for one layer
-        resis = self._resis_layer_(layer)
-        tau = self._tau_layer_(layer)
-        aux = math.sqrt(tau * s)
-
-        if s == 0:
-            A = tau / 2
-            B = (resis * tau) / 6
-            C = tau / resis
-        else:
-            A = (tau / 2) * math.sin(aux) / aux
-            B = (resis / (2 * s)) * (math.sin(aux) / aux - math.cos(aux))
-            C = (tau / (2 * resis)) * ((math.sin(aux) / aux) + math.cos(aux))
-        return np.array([[A, B], [C, A]])
-
     def _H_Matrix_(self, s):
         H = np.eye(2)
         for i in range(len(self.parameter("materials").value)):
@@ -198,45 +272,129 @@ class Construction(Component):
         return H
 
     def _dH_Matrix_(self, s):
-        H = np.zeros((2, 2))
+        return self._H_dH_Matrix_array_(np.array([s], dtype=float))[1][0]
+
+    def _H_Matrix_Layer_array_(self, s, layer):
+        # H Matrix for one layer and a vector of s values: (m, 2, 2)
+        resis = self._resis_layer_(layer)
+        tau = self._tau_layer_(layer)
+        aux = np.sqrt(tau * s)
+        zero = s == 0
+        aux_nz = np.where(zero, 1, aux)
+        sin_aux = np.sin(aux)
+        H = np.empty((len(s), 2, 2))
+        H[:, 0, 0] = np.cos(aux)
+        H[:, 0, 1] = np.where(zero, resis, resis / aux_nz * sin_aux)
+        H[:, 1, 0] = np.where(zero, 0, -aux * sin_aux / resis)
+        H[:, 1, 1] = H[:, 0, 0]
+        return H
+
+    def _dH_Matrix_Layer_array_(self, s, layer):
+        # dif H Matrix for one layer and a vector of s values: (m, 2, 2)
+        resis = self._resis_layer_(layer)
+        tau = self._tau_layer_(layer)
+        aux = np.sqrt(tau * s)
+        zero = s == 0
+        aux_nz = np.where(zero, 1, aux)
+        s_nz = np.where(zero, 1, s)
+        sinc = np.sin(aux) / aux_nz
+        cos_aux = np.cos(aux)
+        dH = np.empty((len(s), 2, 2))
+        dH[:, 0, 0] = np.where(zero, tau / 2, (tau / 2) * sinc)
+        dH[:, 0, 1] = np.where(zero, (resis * tau) / 6,
+                               (resis / (2 * s_nz)) * (sinc - cos_aux))
+        dH[:, 1, 0] = np.where(zero, tau / resis,
+                               (tau / (2 * resis)) * (sinc + cos_aux))
+        dH[:, 1, 1] = dH[:, 0, 0]
+        return dH
+
+    def _H_Matrix_array_(self, s):
+        H = np.broadcast_to(np.eye(2), (len(s), 2, 2))
+        for i in range(len(self.parameter("materials").value)):
+            H = np.matmul(H, self._H_Matrix_Layer_array_(s, i))
+        return H
+
+    def _H_dH_Matrix_array_(self, s):
+        # H and dH for a vector of s values, dH using prefix and suffix products of the layers
         n = len(self.parameter("materials").value)
+        layers = [self._H_Matrix_Layer_array_(s, i) for i in range(n)]
+        identity = np.broadcast_to(np.eye(2), (len(s), 2, 2))
+        prefix = [identity]
         for i in range(n):
-            P1 = np.eye(2)
-            for j in range(i):
-                P1 = np.dot(P1, self._H_Matrix_Layer_(s, j))
-            P2 = np.eye(2)
-            for j in range(i + 1, n):
-                P2 = np.dot(P2, self._H_Matrix_Layer_(s, j))
-            H = H + np.dot(P1, np.dot(self._dH_Matrix_Layer_(s, i), P2))
-        return H
+            prefix.append(np.matmul(prefix[i], layers[i]))
+        suffix = identity
+        dH = np.zeros((len(s), 2, 2))
+        for i in range(n - 1, -1, -1):
+            dH = dH + np.matmul(prefix[i],
+                                np.matmul(self._dH_Matrix_Layer_array_(s, i), suffix))
+            suffix = np.matmul(layers[i], suffix)
+        return (prefix[n], dH)
 
     def _B_roots_(self, delta_t):
         def func(s):
             B = self._H_Matrix_(s)[0, 1]
             return B
 
-        delta_s = 1e-6
+        # Roots are almost evenly spaced in sqrt(s), (k·pi)^2/tau for one layer.
+        # The scan step in sqrt(s) is a fraction of the spacing of the whole construction,
+        # B is evaluated for blocks of steps at once
+        sqrt_tau = 0
+        for i in range(len(self.parameter("materials").value)):
+            sqrt_tau = sqrt_tau + math.sqrt(self._tau_layer_(i))
+        delta_u = math.pi / (_ROOTS_SCAN_DIVISIONS_ * sqrt_tau)
         a = 1e-15
         B_a = func(a)
-        b = delta_s
+        u = 0
         roots = []
         exp = 1
         while exp > 1e-10:
-            B_b = func(b)
-            if B_a * B_b <= 0:  # Signo contrario o un cero
-                bisec = brentq(func, a, b)
-                roots.append(bisec)
-                exp = math.exp(-bisec * delta_t)
-            a = b
-            B_a = B_b
-            b = b + delta_s
+            steps = np.full(_ROOTS_SCAN_DIVISIONS_, delta_u)
+            steps[0] = u + delta_u
+            u_block = np.cumsum(steps)
+            s = u_block * u_block
+            B = self._H_Matrix_array_(s)[:, 0, 1]
+            for j in range(len(s)):
+                if B_a * B[j] <= 0:  # Signo contrario o un cero
+                    bisec = brentq(func, a, s[j])
+                    roots.append(bisec)
+                    exp = math.exp(-bisec * delta_t)
+                    if exp <= 1e-10:
+                        break
+                a = s[j]
+                B_a = B[j]
+            u = u_block[-1]
 
         return roots
 
+    def _layers_key_(self):
+        # Transfer functions only depend on resistance and tau of the layers
+        key = []
+        for i in range(len(self.parameter("materials").value)):
+            key.append((self._resis_layer_(i), self._tau_layer_(i)))
+        return tuple(key)
+
     def _calc_trans_fun_(self, delta_t):
+        key = (self._layers_key_(), delta_t)
+        if key not in _trans_fun_memo_:
+            cache_key = _trans_fun_cache_.key(_TRANS_FUN_VERSION_, *key)
+            data = _trans_fun_cache_.load(cache_key)
+            if data is None:
+                self._calc_trans_fun_coefficients_(delta_t)
+                data = {"a": self._coef_T_a, "b": self._coef_T_b,
+                        "c": self._coef_T_c, "d": np.asarray(self._coef_Q, dtype=float)}
+                _trans_fun_cache_.save(cache_key, data)
+            _trans_fun_memo_[key] = (data["a"], data["b"], data["c"], data["d"])
+        a, b, c, d = _trans_fun_memo_[key]
+        self._coef_T_a = a.copy()
+        self._coef_T_b = b.copy()
+        self._coef_T_c = c.copy()
+        self._coef_Q = d.copy()
+
+    def _calc_trans_fun_coefficients_(self, delta_t):
         min_coef = 1e-10
-        dH_0 = self._dH_Matrix_(0)
-        H_0 = self._H_Matrix_(0)
+        H_0, dH_0 = self._H_dH_Matrix_array_(np.zeros(1))
+        H_0 = H_0[0]
+        dH_0 = dH_0[0]
         C0 = H_0[0, 0] / H_0[0, 1]
         C1x = (dH_0[0, 0] * H_0[0, 1] - H_0[0, 0] * dH_0[0, 1]) / (
             H_0[0, 1] * H_0[0, 1]
@@ -245,39 +403,23 @@ class Construction(Component):
         C1z = (dH_0[1, 1] * H_0[0, 1] - dH_0[0, 1]) / (H_0[0, 1] * H_0[0, 1])
 
         # e_coef
-        roots = self._B_roots_(delta_t)
+        roots = np.array(self._B_roots_(delta_t))
         n_coef = len(roots) + 1
-        ex = []
-        ey = []
-        ez = []
-        h = []
-        for root in roots:
-            H = self._H_Matrix_(root)
-            dH = self._dH_Matrix_(root)
-            ex.append(H[0, 0] / (root * root * dH[0, 1]))
-            ey.append(1 / (root * root * dH[0, 1]))
-            ez.append(H[1, 1] / (root * root * dH[0, 1]))
-            h.append(math.exp(-root * delta_t))
+        H, dH = self._H_dH_Matrix_array_(roots)
+        ex = H[:, 0, 0] / (roots * roots * dH[:, 0, 1])
+        ey = 1 / (roots * roots * dH[:, 0, 1])
+        ez = H[:, 1, 1] / (roots * roots * dH[:, 0, 1])
+        h = np.exp(-roots * delta_t)
         d = [1, -h[0]]
         for i in range(1, len(roots)):
             u = [1, -h[i]]
             d = np.convolve(d, u)
 
-        ox = []
-        oy = []
-        oz = []
-        for i in range(1, n_coef):
-            sum_exp_x = 0
-            sum_exp_y = 0
-            sum_exp_z = 0
-            for j in range(len(roots)):
-                exp = math.exp(-(i) * roots[j] * delta_t)
-                sum_exp_x = sum_exp_x + ex[j] * exp
-                sum_exp_y = sum_exp_y + ey[j] * exp
-                sum_exp_z = sum_exp_z + ez[j] * exp
-            ox.append(C1x + i * C0 * delta_t + sum_exp_x)
-            oy.append(C1y + i * C0 * delta_t + sum_exp_y)
-            oz.append(C1z + i * C0 * delta_t + sum_exp_z)
+        i = np.arange(1, n_coef)
+        exp = np.exp(-np.outer(i, roots) * delta_t)
+        ox = C1x + i * C0 * delta_t + exp @ ex
+        oy = C1y + i * C0 * delta_t + exp @ ey
+        oz = C1z + i * C0 * delta_t + exp @ ez
 
         ramp = [1 / delta_t, -2 / delta_t, 1 / delta_t]
         g = np.convolve(ramp, d)
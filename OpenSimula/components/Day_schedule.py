@@ -1,3 +1,4 @@
+import numpy as np
 from bisect import bisect
 from OpenSimula.Parameters import (
     Parameter_int_list,
@@ -63,3 +64,26 @@ class Day_schedule(Component):
             return (seconds - x_i) / (x_f - x_i) * (y_f - y_i) + y_i
         else:
             return self.parameter("values").value[index - 1]
+
+    def get_values(self, dates):
+        """Values of the schedule for an array of dates
+
+        Args:
+            dates (datetime array): dates
+
+        Returns:
+            numpy array: values of the schedule
+        """
+        seconds = np.array(
+            [date.hour * 3600 + date.minute * 60 + date.second for date in dates])
+        index = np.searchsorted(self._periods_, seconds, side="right")
+        values = np.array(self.parameter("values").value, dtype=float)
+        if self.parameter("interpolation").value == "LINEAR":
+            periods = np.array(self._periods_, dtype=float)
+            x_i = periods[index - 1]
+            x_f = periods[index]
+            y_i = values[index - 1]
+            y_f = np.append(values, values[0])[index]
+            return (seconds - x_i) / (x_f - x_i) * (y_f - y_i) + y_i
+        else:
+            return values[index - 1]
@@ -17,10 +17,12 @@ class Exterior_surface(Real_surface):
 
         self.H_RD = 5.705  # 4*sigma*(293^3)
         # Variables
-        self.add_variable(Variable("T_rm", "°C"))
-        self.add_variable(Variable("E_dir", "W/m²"))
-        self.add_variable(Variable("E_dif", "W/m²"))
+        self.add_variable(Variable("T_rm", "°C", pre_calculated=True))
+        self.add_variable(Variable("E_dir", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("E_dif", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("f_0", "W"))
         self.add_variable(Variable("debug_f", ""))
+        self.variable("q_sol0").pre_calculated = True
 
     def building(self):
         return self.parameter("space").component.building()
@@ -62,34 +64,41 @@ class Exterior_surface(Real_surface):
         self.k[1] = self.area * (self.a_1 - self.parameter("h_cv").value[1])
         self.k_01 = self.area * self.a_01
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
-        self._calculate_variables_pre_iteration(time_index)
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        self._calculate_variables_pre_calculation()
+        self.pre_calculated = True
 
-    def _calculate_variables_pre_iteration(self, time_i):
-        self._T_ext = self._file_met.variable("temperature").values[time_i]
-        hor_sol_dif = self._file_met.variable("sol_diffuse").values[time_i]
-        hor_sol_dir = self._file_met.variable("sol_direct").values[time_i]
-        T_sky = self._file_met.variable("sky_temperature").values[time_i]
-        E_dif = self._file_met.solar_diffuse_rad(time_i, self.orientation_angle(
+    def _calculate_variables_pre_calculation(self):
+        T_ext = self._file_met.variable("temperature").values
+        hor_sol_dif = self._file_met.variable("sol_diffuse").values
+        hor_sol_dir = self._file_met.variable("sol_direct").values
+        T_sky = self._file_met.variable("sky_temperature").values
+        E_dif = self._file_met.solar_diffuse_rad_array(self.orientation_angle(
             "azimuth", 0),  self.orientation_angle("altitude", 0))
         E_dif = E_dif + (1-self._F_sky)*self._albedo * \
             (hor_sol_dif+hor_sol_dir)
-        self.variable("E_dif").values[time_i] = E_dif
-        E_dir = self._file_met.solar_direct_rad(time_i, self.orientation_angle(
+        self.variable("E_dif").values = E_dif
+        E_dir = self._file_met.solar_direct_rad_array(self.orientation_angle(
             "azimuth", 0),  self.orientation_angle("altitude", 0))
-        self.variable("E_dir").values[time_i] = E_dir
-        T_rm = self._F_sky * T_sky + (1-self._F_sky)*self._T_ext
-        self.variable("T_rm").values[time_i] = T_rm
-        h_rd = self.H_RD * self.radiant_property("alpha", "long_wave", 0)
+        self.variable("E_dir").values = E_dir
+        T_rm = self._F_sky * T_sky + (1-self._F_sky)*T_ext
+        self.variable("T_rm").values = T_rm
         q_sol = self.radiant_property(
             "alpha", "solar_diffuse", 0) * (E_dif + E_dir)
-        self.variable("q_sol0").values[time_i] = q_sol
-        p_0, p_1 = self.parameter("construction").component.get_P(
-            time_i, self.variable("T_s0").values, self.variable("T_s1").values, self.variable("q_cd0").values, self.variable("q_cd1").values, self._T_ini)
-        self.variable("p_0").values[time_i] = p_0
-        self.variable("p_1").values[time_i] = p_1
-        self.f_0 = self.area * \
+        self.variable("q_sol0").values = q_sol
+
+    def pre_iteration(self, time_index, date, daylight_saving):
+        super().pre_iteration(time_index, date, daylight_saving)
+        self._calculate_variables_pre_iteration(time_index)
+
+    def _calculate_variables_pre_iteration(self, time_i):
+        self._T_ext = self._file_met.variable("temperature").values[time_i]
+        T_rm = self.variable("T_rm").values[time_i]
+        h_rd = self.H_RD * self.radiant_property("alpha", "long_wave", 0)
+        q_sol = self.variable("q_sol0").values[time_i]
+        p_0, p_1 = self._get_P(time_i)
+        self.variable("f_0").values[time_i] = self.area * \
             (- p_0 - self.parameter("h_cv").value[0]
              * self._T_ext - h_rd * T_rm - q_sol)
 
@@ -99,7 +108,7 @@ class Exterior_surface(Real_surface):
         self._calculate_heat_fluxes(time_index)
 
     def _calculate_T_s0(self, time_i):
-        T_s0 = (self.f_0 - self.k_01 *
+        T_s0 = (self.variable("f_0").values[time_i] - self.k_01 *
                 self.variable("T_s1").values[time_i])/self.k[0]
         self.variable("T_s0").values[time_i] = T_s0
 
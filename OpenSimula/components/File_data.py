@@ -41,7 +41,7 @@ class File_data(Component):
             # Create Variable
             for col in self._df_.columns:
                 self.add_variable(Variable(self._extract_name_(
-                    col), unit=self._extract_unit_(col)))
+                    col), unit=self._extract_unit_(col), pre_calculated=True))
 
         except Exception as ex:
             if type(ex).__name__ == "FileNotFoundError":
@@ -60,15 +60,12 @@ class File_data(Component):
         self.data_array = self._df_.to_numpy()
 
         if self.parameter("file_step").value == "SIMULATION":
-            i = 0
-            k = 0
+            # Records are repeated cyclically, continuing from one variable to the next
             n = len(self._df_)
+            i = 0
             for key, var in self._variables_.items():
-                for j in range(n_time_steps):
-                    var.values[j] = self.data_array[k][i]
-                    k = k + 1
-                    if k == n:
-                        k = 0
+                rows = (np.arange(n_time_steps) + i * n_time_steps) % n
+                var.values = self.data_array[rows, i]
                 i = i + 1
         elif self.parameter("file_step").value == "OWN":
             n = len(self._df_)
@@ -81,15 +78,16 @@ class File_data(Component):
                 self.dates[i] = date
                 date = date + dt.timedelta(0, delta_t)
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
         if self.parameter("file_step").value == "OWN":
-            i, j, f = self._get_interpolation_tuple_(date)
+            i, j, f = self._get_interpolation_tuple_(dates)
             k = 0
             for key, var in self._variables_.items():
-                var.values[time_index] = self.data_array[i][k] * \
-                    (1 - f) + self.data_array[j][k] * f
+                var.values = self.data_array[i, k] * \
+                    (1 - f) + self.data_array[j, k] * f
                 k = k + 1
+        self.pre_calculated = True
 
     def _extract_name_(self, name):
         if name.rfind("[") == -1:
@@ -103,17 +101,13 @@ class File_data(Component):
         else:
             return name[name.rfind("[") + 1: name.rfind("]")].strip()
 
-    def _get_interpolation_tuple_(self, date):
-        seconds = (date-self._initial_date_).total_seconds()
+    def _get_interpolation_tuple_(self, dates):
+        seconds = np.array([(date-self._initial_date_).total_seconds()
+                           for date in dates])
         index = seconds / self.parameter("time_step").value
         n = len(self._df_)
-        if index < 0:
-            index = 0
-        elif index >= n:
-            index = n-1
-        i = math.floor(index)
-        j = i + 1
-        if j >= n:
-            j = n-1
+        index = np.clip(index, 0, n-1)
+        i = np.floor(index).astype(int)
+        j = np.minimum(i + 1, n-1)
         f = index - i
         return (i, j, f)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from scipy.integrate import quad
 from OpenSimula.Component import Component
 from OpenSimula.Parameters import Parameter_float, Parameter_float_list, Parameter_math_exp, Parameter_math_exp_list
@@ -94,15 +95,27 @@ class Glazing(Component):
             elif (prop == "alpha_other_side"):
                 return self.alpha_solar_diffuse[side]*(1-self.alpha_own_side_fraction[side])
         elif (radiation_type == "solar_direct"):
-            # variables dictonary
-            var_dic = {"cos_theta": math.cos(theta)}
+            # variables dictonary, theta may be an array of angles
+            if isinstance(theta, np.ndarray):
+                var_dic = {"cos_theta": np.cos(theta)}
+            else:
+                var_dic = {"cos_theta": math.cos(theta)}
             if (prop == "rho"):
                 rho_n = self.parameter("solar_rho").value[side]
-                f_rho = self.parameter(
-                    "f_1_minus_rho_nor").evaluate(side, var_dic)
+                if isinstance(theta, np.ndarray):
+                    f_rho = self.parameter(
+                        "f_1_minus_rho_nor").evaluate_array(side, var_dic)
+                else:
+                    f_rho = self.parameter(
+                        "f_1_minus_rho_nor").evaluate(side, var_dic)
                 return 1-(1-rho_n)*f_rho
             elif (prop == "tau"):
-                return self.parameter("solar_tau").value * self.parameter("f_tau_nor").evaluate(var_dic)
+                if isinstance(theta, np.ndarray):
+                    f_tau = self.parameter(
+                        "f_tau_nor").evaluate_array(var_dic)
+                else:
+                    f_tau = self.parameter("f_tau_nor").evaluate(var_dic)
+                return self.parameter("solar_tau").value * f_tau
             elif (prop == "alpha"):
                 alpha = 1 - self.radiant_property("tau", radiation_type, side, theta) - \
                     self.radiant_property("rho", radiation_type, side, theta)
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from OpenSimula.Component import Component
 from OpenSimula.Parameters import Parameter_component, Parameter_float, Parameter_float_list
 from OpenSimula.Variable import Variable
@@ -26,25 +27,26 @@ class Opening(Component):
         # Variables
         self.add_variable(Variable("T_s0", "°C"))
         self.add_variable(Variable("T_s1", "°C"))
-        self.add_variable(Variable("T_rm", "°C"))
-        self.add_variable(Variable("E_dir", "W/m²"))
-        self.add_variable(Variable("E_dif", "W/m²"))
-        self.add_variable(Variable("f_setback", "ratio"))
-        self.add_variable(Variable("E_dir_tra", "W/m²"))
-        self.add_variable(Variable("E_dif_tra", "W/m²"))
+        self.add_variable(Variable("T_rm", "°C", pre_calculated=True))
+        self.add_variable(Variable("E_dir", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("E_dif", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("f_setback", "ratio", pre_calculated=True))
+        self.add_variable(Variable("E_dir_tra", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("E_dif_tra", "W/m²", pre_calculated=True))
         self.add_variable(Variable("E_ref", "W/m²"))
         self.add_variable(Variable("E_ref_tra", "W/m²"))
         self.add_variable(Variable("q_cv0", "W/m²"))
         self.add_variable(Variable("q_cv1", "W/m²"))
         self.add_variable(Variable("q_cd", "W/m²"))
-        self.add_variable(Variable("q_sol0", "W/m²"))
-        self.add_variable(Variable("q_sol1", "W/m²"))
+        self.add_variable(Variable("q_sol0", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("q_sol1", "W/m²", pre_calculated=True))
         self.add_variable(Variable("q_swig0", "W/m²"))
         self.add_variable(Variable("q_swig1", "W/m²"))
         self.add_variable(Variable("q_lwig0", "W/m²"))
         self.add_variable(Variable("q_lwig1", "W/m²"))
         self.add_variable(Variable("q_lwt0", "W/m²"))
         self.add_variable(Variable("q_lwt1", "W/m²"))
+        self.add_variable(Variable("f_0", "W", pre_calculated=True))
         self.add_variable(Variable("debug_f", ""))
 
     def check(self):
@@ -80,63 +82,61 @@ class Opening(Component):
         self.k_01 = self.area / \
             self.parameter("opening_type").component.thermal_resistance()
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
-        self._calculate_variables_pre_iteration(time_index)
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        self._calculate_variables_pre_calculation()
+        self.pre_calculated = True
 
-    def _calculate_variables_pre_iteration(self, time_i):
-        self._T_ext = self._file_met.variable("temperature").values[time_i]
+    def _calculate_variables_pre_calculation(self):
         surface = self.parameter("surface").component
-        self.variable("E_dif").values[time_i] = surface.variable(
-            "E_dif").values[time_i]
-        self.variable("T_rm").values[time_i] = surface.variable(
-            "T_rm").values[time_i]
-        theta = self._file_met.solar_surface_angle(time_i, surface.orientation_angle(
-            "azimuth", 0), surface.orientation_angle("altitude", 0))
+        azimuth = surface.orientation_angle("azimuth", 0)
+        altitude = surface.orientation_angle("altitude", 0)
+        self.variable("E_dif").values = surface.variable("E_dif").values
+        self.variable("T_rm").values = surface.variable("T_rm").values
+        theta = self._file_met.solar_surface_angle_array(azimuth, altitude)
+        sun = ~np.isnan(theta)
         # Setback shadow
-        if (theta is not None and self.parameter("setback").value > 0):
-            f_setback = self._f_setback_(time_i, surface.orientation_angle(
-                "azimuth", 0), surface.orientation_angle(
-                "altitude", 0))
-        else:
-            f_setback = 1
-        self.variable("f_setback").values[time_i] = f_setback
-        self.variable("E_dir").values[time_i] = surface.variable(
-            "E_dir").values[time_i] * f_setback
-        q_sol0 = self.radiant_property(
-            "alpha", "solar_diffuse", 0) * self.variable("E_dif").values[time_i]
+        f_setback = np.ones(len(theta))
+        if (self.parameter("setback").value > 0):
+            f_setback[sun] = self._f_setback_(azimuth, altitude)[sun]
+        self.variable("f_setback").values = f_setback
+        self.variable("E_dir").values = surface.variable(
+            "E_dir").values * f_setback
+        E_dif = self.variable("E_dif").values
+        E_dir = self.variable("E_dir").values
+        q_sol0 = self.radiant_property("alpha", "solar_diffuse", 0) * E_dif
         q_sol1 = self.radiant_property(
-            "alpha_other_side", "solar_diffuse", 0) * self.variable("E_dif").values[time_i]
-        self.variable("E_dif_tra").values[time_i] = self.variable(
-            "E_dif").values[time_i]*self.radiant_property("tau", "solar_diffuse", 0)
-        if theta is not None:  # direct radiation
-            self.variable("E_dir_tra").values[time_i] = self.variable(
-                "E_dir").values[time_i]*self.radiant_property("tau", "solar_direct", 0, theta)
-            q_sol0 += self.radiant_property("alpha", "solar_direct",
-                                            0, theta) * self.variable("E_dir").values[time_i]
-            q_sol1 += self.radiant_property("alpha_other_side", "solar_direct",
-                                            0, theta) * self.variable("E_dir").values[time_i]
-        self.variable("q_sol0").values[time_i] = q_sol0
-        self.variable("q_sol1").values[time_i] = q_sol1
-        h_rd = self.H_RD * self.radiant_property("alpha", "long_wave", 0)
-        T_rm = self.variable("T_rm").values[time_i]
-        self.f_0 = self.area * \
-            (- self.parameter("h_cv").value[0] * self._T_ext - h_rd * T_rm)
+            "alpha_other_side", "solar_diffuse", 0) * E_dif
+        self.variable("E_dif_tra").values = E_dif * \
+            self.radiant_property("tau", "solar_diffuse", 0)
+        # direct radiation
+        E_dir_tra = np.zeros(len(theta))
+        E_dir_tra[sun] = E_dir[sun] * \
+            self.radiant_property("tau", "solar_direct", 0, theta[sun])
+        self.variable("E_dir_tra").values = E_dir_tra
+        q_sol0[sun] += self.radiant_property("alpha", "solar_direct",
+                                             0, theta[sun]) * E_dir[sun]
+        q_sol1[sun] += self.radiant_property("alpha_other_side", "solar_direct",
+                                             0, theta[sun]) * E_dir[sun]
+        self.variable("q_sol0").values = q_sol0
+        self.variable("q_sol1").values = q_sol1
         # q_sol0 will be added by the building
+        h_rd = self.H_RD * self.radiant_property("alpha", "long_wave", 0)
+        self.variable("f_0").values = self.area * \
+            (- self.parameter("h_cv").value[0] * self._file_met.variable("temperature").values
+             - h_rd * self.variable("T_rm").values)
 
-    def _f_setback_(self, time_i, azimuth_sur, altitude_sur):
-        theta_h = math.fabs(self._file_met.variable(
-            "sol_azimuth").values[time_i] - azimuth_sur)
+    def _f_setback_(self, azimuth_sur, altitude_sur):
+        theta_h = np.fabs(self._file_met.variable(
+            "sol_azimuth").values - azimuth_sur)
         f_shadow_h = self.parameter(
-            "setback").value*math.tan(math.radians(theta_h)) / self.parameter("width").value
-        if f_shadow_h > 1:
-            f_shadow_h = 1
-        theta_v = math.fabs(self._file_met.variable(
-            "sol_altitude").values[time_i] - altitude_sur)
+            "setback").value*np.tan(np.radians(theta_h)) / self.parameter("width").value
+        f_shadow_h = np.minimum(f_shadow_h, 1)
+        theta_v = np.fabs(self._file_met.variable(
+            "sol_altitude").values - altitude_sur)
         f_shadow_v = self.parameter(
-            "setback").value*math.tan(math.radians(theta_v))/self.parameter("height").value
-        if f_shadow_v > 1:
-            f_shadow_v = 1
+            "setback").value*np.tan(np.radians(theta_v))/self.parameter("height").value
+        f_shadow_v = np.minimum(f_shadow_v, 1)
         return (1-f_shadow_h)*(1-f_shadow_v)
 
     def post_iteration(self, time_index, date, daylight_saving, converged):
@@ -145,7 +145,7 @@ class Opening(Component):
         self._calculate_heat_fluxes(time_index)
 
     def _calculate_T_s0(self, time_i):
-        T_s0 = (self.f_0 - (self.variable("q_sol0").values[time_i] + self.variable("q_swig0").values[time_i])*self.area - self.k_01 *
+        T_s0 = (self.variable("f_0").values[time_i] - (self.variable("q_sol0").values[time_i] + self.variable("q_swig0").values[time_i])*self.area - self.k_01 *
                 self.variable("T_s1").values[time_i])/self.k[0]
         self.variable("T_s0").values[time_i] = T_s0
 
@@ -153,8 +153,9 @@ class Opening(Component):
         q_cd0 = (self.variable("T_s1").values[time_i] - self.variable(
             "T_s0").values[time_i]) / self.parameter("opening_type").component.thermal_resistance()
         self.variable("q_cd").values[time_i] = q_cd0
+        T_ext = self._file_met.variable("temperature").values[time_i]
         self.variable("q_cv0").values[time_i] = self.parameter(
-            "h_cv").value[0] * (self._T_ext - self.variable("T_s0").values[time_i])
+            "h_cv").value[0] * (T_ext - self.variable("T_s0").values[time_i])
         T_z = self.parameter("surface").component.parameter(
             "space").component.variable("temperature").values[time_i]
         self.variable("q_cv1").values[time_i] = self.parameter(
@@ -13,12 +13,12 @@ class Real_surface(Surface):
             "construction", "not_defined", ["Construction"]))
 
         # Variables
-        self.add_variable(Variable("T_s0", "°C"))
-        self.add_variable(Variable("T_s1", "°C"))
-        self.add_variable(Variable("q_cd0", "W/m²"))
-        self.add_variable(Variable("q_cd1", "W/m²"))
-        self.add_variable(Variable("p_0", "W/m²"))
-        self.add_variable(Variable("p_1", "W/m²"))
+        self.add_variable(Variable("T_s0", "°C", state=True))
+        self.add_variable(Variable("T_s1", "°C", state=True))
+        self.add_variable(Variable("q_cd0", "W/m²", state=True))
+        self.add_variable(Variable("q_cd1", "W/m²", state=True))
+        self.add_variable(Variable("p_0", "W/m²", state=True))
+        self.add_variable(Variable("p_1", "W/m²", state=True))
         self.add_variable(Variable("q_cv0", "W/m²"))
         self.add_variable(Variable("q_cv1", "W/m²"))
         self.add_variable(Variable("q_sol0", "W/m²"))
@@ -43,5 +43,9 @@ class Real_surface(Surface):
             )
         return errors
 
+    def _get_P(self, time_i):
+        # p_0 and p_1 are calculated by the building for all its surfaces
+        return (self.variable("p_0").values[time_i], self.variable("p_1").values[time_i])
+
     def radiant_property(self, prop, radiation_type, side, theta=0):
         return self.parameter("construction").component.radiant_property(prop, radiation_type, side, theta)
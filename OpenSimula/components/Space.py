@@ -7,6 +7,9 @@ import math
 
 
 class Space(Component):
+    # Gains are calculated in pre_iteration if they are not pre_calculated
+    pre_calculated_hooks = ["pre_iteration"]
+
     def __init__(self, name, project):
         Component.__init__(self, name, project)
         self.parameter("type").value = "Space"
@@ -23,19 +26,19 @@ class Space(Component):
         self.add_parameter(Parameter_boolean("perfect_conditioning", False))
 
         # Variables
-        self.add_variable(Variable("temperature", unit="°C"))
-        self.add_variable(Variable("abs_humidity", unit="g/kg"))
+        self.add_variable(Variable("temperature", unit="°C", history=1))
+        self.add_variable(Variable("abs_humidity", unit="g/kg", history=1))
         self.add_variable(Variable("rel_humidity", unit="%"))
-        self.add_variable(Variable("people_convective", unit="W"))
-        self.add_variable(Variable("people_radiant", unit="W"))
-        self.add_variable(Variable("people_latent", unit="W"))
-        self.add_variable(Variable("light_convective", unit="W"))
-        self.add_variable(Variable("light_radiant", unit="W"))
-        self.add_variable(Variable("other_gains_convective", unit="W"))
-        self.add_variable(Variable("other_gains_radiant", unit="W"))
-        self.add_variable(Variable("other_gains_latent", unit="W"))
-        self.add_variable(Variable("solar_direct_gains", unit="W"))
-        self.add_variable(Variable("infiltration_flow", unit="m³/s"))
+        self.add_variable(Variable("people_convective", unit="W", pre_calculated=True))
+        self.add_variable(Variable("people_radiant", unit="W", pre_calculated=True))
+        self.add_variable(Variable("people_latent", unit="W", pre_calculated=True))
+        self.add_variable(Variable("light_convective", unit="W", pre_calculated=True))
+        self.add_variable(Variable("light_radiant", unit="W", pre_calculated=True))
+        self.add_variable(Variable("other_gains_convective", unit="W", pre_calculated=True))
+        self.add_variable(Variable("other_gains_radiant", unit="W", pre_calculated=True))
+        self.add_variable(Variable("other_gains_latent", unit="W", pre_calculated=True))
+        self.add_variable(Variable("solar_direct_gains", unit="W", pre_calculated=True))
+        self.add_variable(Variable("infiltration_flow", unit="m³/s", pre_calculated=True))
         self.add_variable(Variable("surfaces_convective", unit="W"))
         self.add_variable(Variable("delta_int_energy", unit="W"))
         self.add_variable(Variable("infiltration_sensible_heat", unit="W"))
@@ -196,55 +199,72 @@ class Space(Component):
                 self.dsr_dist_vector[i] = 1/total_area
             self.ig_dist_vector[i] = 1/total_area
 
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        # All the time steps at once if space type and solar surfaces are already calculated
+        if not self._space_type_comp.pre_calculated:
+            return
+        for surface in self.surfaces:
+            s_type = surface.parameter("type").value
+            if s_type in ["Opening", "Virtual_exterior_surface"] and not surface.pre_calculated:
+                return
+        self._calculate_gains(slice(None))
+        self.pre_calculated = True
+
     def pre_iteration(self, time_index, date, daylight_saving):
         super().pre_iteration(time_index, date, daylight_saving)
-        self._calculate_solar_direct_gains(time_index)
+        if not self.pre_calculated:
+            self._calculate_gains(time_index)
+
+    def _calculate_gains(self, index):
+        # index: time index or slice for all the time steps
+        self._calculate_solar_direct_gains(index)
 
         # People
-        self.variable("people_convective").values[time_index] = self._area * \
+        self.variable("people_convective").values[index] = self._area * \
             self._space_type_comp.variable(
-                "people_convective").values[time_index]
-        self.variable("people_latent").values[time_index] = self._area * \
-            self._space_type_comp.variable("people_latent").values[time_index]
-        self.variable("people_radiant").values[time_index] = self._area * \
+                "people_convective").values[index]
+        self.variable("people_latent").values[index] = self._area * \
+            self._space_type_comp.variable("people_latent").values[index]
+        self.variable("people_radiant").values[index] = self._area * \
             self._space_type_comp.variable(
-                "people_radiant").values[time_index]
+                "people_radiant").values[index]
 
         # Light
-        self.variable("light_convective").values[time_index] = self._area * \
+        self.variable("light_convective").values[index] = self._area * \
             self._space_type_comp.variable(
-                "light_convective").values[time_index]
-        self.variable("light_radiant").values[time_index] = self._area * \
-            self._space_type_comp.variable("light_radiant").values[time_index]
+                "light_convective").values[index]
+        self.variable("light_radiant").values[index] = self._area * \
+            self._space_type_comp.variable("light_radiant").values[index]
 
         # Other gains
-        self.variable("other_gains_convective").values[time_index] = self._area * \
+        self.variable("other_gains_convective").values[index] = self._area * \
             self._space_type_comp.variable(
-                "other_gains_convective").values[time_index]
-        self.variable("other_gains_latent").values[time_index] = self._area * \
+                "other_gains_convective").values[index]
+        self.variable("other_gains_latent").values[index] = self._area * \
             self._space_type_comp.variable(
-                "other_gains_latent").values[time_index]
-        self.variable("other_gains_radiant").values[time_index] = self._area * \
+                "other_gains_latent").values[index]
+        self.variable("other_gains_radiant").values[index] = self._area * \
             self._space_type_comp.variable(
-                "other_gains_radiant").values[time_index]
+                "other_gains_radiant").values[index]
 
         # Infiltration
-        self.variable("infiltration_flow").values[time_index] = self._volume * \
+        self.variable("infiltration_flow").values[index] = self._volume * \
             self._space_type_comp.variable(
-                "infiltration_rate").values[time_index] / 3600
+                "infiltration_rate").values[index] / 3600
 
-    def _calculate_solar_direct_gains(self, time_i):
+    def _calculate_solar_direct_gains(self, index):
         solar_gain = 0
         for i in range(len(self.surfaces)):
             s_type = self.surfaces[i].parameter("type").value
             if s_type == "Opening":
                 solar_gain += self.surfaces[i].area * \
-                    self.surfaces[i].variable("E_dir_tra").values[time_i]
+                    self.surfaces[i].variable("E_dir_tra").values[index]
             elif s_type == "Virtual_exterior_surface":
                 solar_gain += self.surfaces[i].area * \
-                    self.surfaces[i].variable("E_dir").values[time_i]
+                    self.surfaces[i].variable("E_dir").values[index]
 
-        self.variable("solar_direct_gains").values[time_i] = solar_gain
+        self.variable("solar_direct_gains").values[index] = solar_gain
 
     def post_iteration(self, time_index, date, daylight_saving, converged):
         super().post_iteration(time_index, date, daylight_saving, converged)
@@ -1,9 +1,13 @@
 from OpenSimula.Component import Component
 from OpenSimula.Parameters import Parameter_float, Parameter_math_exp, Parameter_variable_list
 from OpenSimula.Variable import Variable
+import numpy as np
 
 
 class Space_type(Component):
+    # Variables are calculated in pre_iteration if they are not pre_calculated
+    pre_calculated_hooks = ["pre_iteration"]
+
     def __init__(self, name, project):
         Component.__init__(self, name, project)
         self.parameter("type").value = "Space_type"
@@ -33,19 +37,19 @@ class Space_type(Component):
         self.add_parameter(Parameter_math_exp("cooling_on_off", "1", "on/off"))
 
         # Variables
-        self.add_variable(Variable("people_convective", unit="W/m²"))
-        self.add_variable(Variable("people_radiant", unit="W/m²"))
-        self.add_variable(Variable("people_latent", unit="W/m²"))
-        self.add_variable(Variable("light_convective", unit="W/m²"))
-        self.add_variable(Variable("light_radiant", unit="W/m²"))
-        self.add_variable(Variable("other_gains_convective", unit="W/m²"))
-        self.add_variable(Variable("other_gains_radiant", unit="W/m²"))
-        self.add_variable(Variable("other_gains_latent", unit="W/m²"))
-        self.add_variable(Variable("infiltration_rate", unit="1/h"))
-        self.add_variable(Variable("heating_setpoint", unit="°C"))
-        self.add_variable(Variable("cooling_setpoint", unit="°C"))
-        self.add_variable(Variable("heating_on_off", unit="on/off"))
-        self.add_variable(Variable("cooling_on_off", unit="on/off"))
+        self.add_variable(Variable("people_convective", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("people_radiant", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("people_latent", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("light_convective", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("light_radiant", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("other_gains_convective", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("other_gains_radiant", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("other_gains_latent", unit="W/m²", pre_calculated=True))
+        self.add_variable(Variable("infiltration_rate", unit="1/h", pre_calculated=True))
+        self.add_variable(Variable("heating_setpoint", unit="°C", pre_calculated=True))
+        self.add_variable(Variable("cooling_setpoint", unit="°C", pre_calculated=True))
+        self.add_variable(Variable("heating_on_off", unit="on/off", pre_calculated=True))
+        self.add_variable(Variable("cooling_on_off", unit="on/off", pre_calculated=True))
 
     def pre_simulation(self, n_time_steps, delta_t):
         super().pre_simulation(n_time_steps, delta_t)
@@ -57,59 +61,76 @@ class Space_type(Component):
                 self.parameter("input_variables").symbol[i])
             self.input_var_variable.append(
                 self.parameter("input_variables").variable[i])
+        self._n_time_steps = n_time_steps
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
-        # variables dictonary
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        # All the time steps at once if the input variables are already calculated
+        for variable in self.input_var_variable:
+            if not variable.parent.pre_calculated:
+                return
         var_dic = {}
         for i in range(len(self.input_var_symbol)):
-            var_dic[self.input_var_symbol[i]
-                    ] = self.input_var_variable[i].values[time_index]
+            var_dic[self.input_var_symbol[i]] = self.input_var_variable[i].values
+        self._calculate_variables(slice(None), var_dic)
+        self.pre_calculated = True
+
+    def pre_iteration(self, time_index, date, daylight_saving):
+        super().pre_iteration(time_index, date, daylight_saving)
+        if not self.pre_calculated:
+            # variables dictonary
+            var_dic = {}
+            for i in range(len(self.input_var_symbol)):
+                var_dic[self.input_var_symbol[i]
+                        ] = self.input_var_variable[i].values[time_index]
+            self._calculate_variables(time_index, var_dic)
+
+    def _evaluate(self, key, index, var_dic):
+        if isinstance(index, slice):  # var_dic contains arrays
+            return self.parameter(key).evaluate_array(var_dic, self._n_time_steps)
+        else:
+            return self.parameter(key).evaluate(var_dic)
 
+    def _calculate_variables(self, index, var_dic):
+        # index: time index or slice for all the time steps
         # People
-        people = self.parameter("people_density").evaluate(var_dic)
-        self.variable("people_convective").values[time_index] = (people * self.parameter(
+        people = self._evaluate("people_density", index, var_dic)
+        self.variable("people_convective").values[index] = (people * self.parameter(
             "people_sensible").value * (1 - self.parameter("people_radiant_fraction").value))
-        self.variable("people_radiant").values[time_index] = (people * self.parameter(
+        self.variable("people_radiant").values[index] = (people * self.parameter(
             "people_sensible").value * self.parameter("people_radiant_fraction").value)
-        self.variable("people_latent").values[time_index] = (
+        self.variable("people_latent").values[index] = (
             people * self.parameter("people_latent").value)
 
         # Light
-        light = self.parameter("light_density").evaluate(var_dic)
-        self.variable("light_convective").values[time_index] = light * (
+        light = self._evaluate("light_density", index, var_dic)
+        self.variable("light_convective").values[index] = light * (
             1 - self.parameter("light_radiant_fraction").value)
-        self.variable("light_radiant").values[time_index] = light * \
+        self.variable("light_radiant").values[index] = light * \
             self.parameter("light_radiant_fraction").value
 
         # Other gains
-        other = self.parameter("other_gains_density").evaluate(var_dic)
-        self.variable("other_gains_convective").values[time_index] = other * (1 - self.parameter(
+        other = self._evaluate("other_gains_density", index, var_dic)
+        self.variable("other_gains_convective").values[index] = other * (1 - self.parameter(
             "other_gains_latent_fraction").value) * (1 - self.parameter("other_gains_radiant_fraction").value)
 
-        self.variable("other_gains_radiant").values[time_index] = other * (1 - self.parameter(
+        self.variable("other_gains_radiant").values[index] = other * (1 - self.parameter(
             "other_gains_latent_fraction").value) * self.parameter("other_gains_radiant_fraction").value
 
-        self.variable("other_gains_latent").values[time_index] = other * self.parameter(
+        self.variable("other_gains_latent").values[index] = other * self.parameter(
             "other_gains_latent_fraction").value
 
         # Infiltration
-        self.variable("infiltration_rate").values[time_index] = self.parameter(
-            "infiltration").evaluate(var_dic)
-        
-        # setpoints
-        self.variable("heating_setpoint").values[time_index] = self.parameter(
-            "heating_setpoint").evaluate(var_dic)
-        self.variable("cooling_setpoint").values[time_index] = self.parameter(
-            "cooling_setpoint").evaluate(var_dic)
-         # on/off
-        self.variable("heating_on_off").values[time_index] = self.parameter(
-            "heating_on_off").evaluate(var_dic)
-        if self.variable("heating_on_off").values[time_index] != 0:
-            self.variable("heating_on_off").values[time_index] = 1
-        self.variable("cooling_on_off").values[time_index] = self.parameter(
-            "cooling_on_off").evaluate(var_dic)
-        if self.variable("cooling_on_off").values[time_index] != 0:
-            self.variable("cooling_on_off").values[time_index] = 1
-
+        self.variable("infiltration_rate").values[index] = self._evaluate(
+            "infiltration", index, var_dic)
 
+        # setpoints
+        self.variable("heating_setpoint").values[index] = self._evaluate(
+            "heating_setpoint", index, var_dic)
+        self.variable("cooling_setpoint").values[index] = self._evaluate(
+            "cooling_setpoint", index, var_dic)
+        # on/off, 1 if not 0
+        self.variable("heating_on_off").values[index] = np.not_equal(self._evaluate(
+            "heating_on_off", index, var_dic), 0)
+        self.variable("cooling_on_off").values[index] = np.not_equal(self._evaluate(
+            "cooling_on_off", index, var_dic), 0)
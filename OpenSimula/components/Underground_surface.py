@@ -14,6 +14,7 @@ class Underground_surface(Real_surface):
 
         # Variables
         self.add_variable(Variable("debug_f", ""))
+        self.variable("T_s0").pre_calculated = True
 
     def building(self):
         return self.parameter("space").component.building()
@@ -42,17 +43,11 @@ class Underground_surface(Real_surface):
         self.k[1] = self.area * (self.a_1 - self.parameter("h_cv").value)
         self.k_01 = self.area * self.a_01
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
-        self._calculate_variables_pre_iteration(time_index)
-
-    def _calculate_variables_pre_iteration(self, time_i):
-        self.variable("T_s0").values[time_i] = self._file_met.variable(
-            "underground_temperature").values[time_i]
-        p_0, p_1 = self.parameter("construction").component.get_P(
-            time_i, self.variable("T_s0").values, self.variable("T_s1").values, self.variable("q_cd0").values, self.variable("q_cd1").values, self._T_ini)
-        self.variable("p_0").values[time_i] = p_0
-        self.variable("p_1").values[time_i] = p_1
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        self.variable("T_s0").values = self._file_met.variable(
+            "underground_temperature").values
+        self.pre_calculated = True
 
     def post_iteration(self, time_index, date, daylight_saving, converged):
         super().post_iteration(time_index, date, daylight_saving, converged)
@@ -16,9 +16,9 @@ class Virtual_exterior_surface(Virtual_surface):
         self.H_RD = 5.705  # 4*sigma*(293^3)
 
         # Variables
-        self.add_variable(Variable("T_rm", "°C"))
-        self.add_variable(Variable("E_dir", "W/m²"))
-        self.add_variable(Variable("E_dif", "W/m²"))
+        self.add_variable(Variable("T_rm", "°C", pre_calculated=True))
+        self.add_variable(Variable("E_dir", "W/m²", pre_calculated=True))
+        self.add_variable(Variable("E_dif", "W/m²", pre_calculated=True))
 
     def building(self):
         return self.parameter("space").component.building()
@@ -42,22 +42,23 @@ class Virtual_exterior_surface(Virtual_surface):
         self._F_sky = (
             1 + math.sin(math.radians(self.parameter("altitude").value)))/2
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
-        self._calculate_variables_pre_iteration(time_index)
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        self._calculate_variables_pre_calculation()
+        self.pre_calculated = True
 
-    def _calculate_variables_pre_iteration(self, time_i):
-        self._T_ext = self._file_met.variable("temperature").values[time_i]
-        hor_sol_dif = self._file_met.variable("sol_diffuse").values[time_i]
-        hor_sol_dir = self._file_met.variable("sol_direct").values[time_i]
-        T_sky = self._file_met.variable("sky_temperature").values[time_i]
-        E_dif = self._file_met.solar_diffuse_rad(time_i, self.orientation_angle(
+    def _calculate_variables_pre_calculation(self):
+        T_ext = self._file_met.variable("temperature").values
+        hor_sol_dif = self._file_met.variable("sol_diffuse").values
+        hor_sol_dir = self._file_met.variable("sol_direct").values
+        T_sky = self._file_met.variable("sky_temperature").values
+        E_dif = self._file_met.solar_diffuse_rad_array(self.orientation_angle(
             "azimuth", 0),  self.orientation_angle("altitude", 0))
         E_dif = E_dif + (1-self._F_sky)*self._albedo * \
             (hor_sol_dif+hor_sol_dir)
-        self.variable("E_dif").values[time_i] = E_dif
-        E_dir = self._file_met.solar_direct_rad(time_i, self.orientation_angle(
+        self.variable("E_dif").values = E_dif
+        E_dir = self._file_met.solar_direct_rad_array(self.orientation_angle(
             "azimuth", 0),  self.orientation_angle("altitude", 0))
-        self.variable("E_dir").values[time_i] = E_dir
-        T_rm = self._F_sky * T_sky + (1-self._F_sky)*self._T_ext
-        self.variable("T_rm").values[time_i] = T_rm
+        self.variable("E_dir").values = E_dir
+        T_rm = self._F_sky * T_sky + (1-self._F_sky)*T_ext
+        self.variable("T_rm").values = T_rm
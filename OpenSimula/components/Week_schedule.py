@@ -1,3 +1,4 @@
+import numpy as np
 from OpenSimula.Parameters import Parameter_component_list
 from OpenSimula.Component import Component
 
@@ -29,3 +30,23 @@ class Week_schedule(Component):
         else:
             index = date.weekday()
             return self.parameter("days_schedules").component[index].get_value(date)
+
+    def get_values(self, dates):
+        """Values of the schedule for an array of dates
+
+        Args:
+            dates (datetime array): dates
+
+        Returns:
+            numpy array: values of the schedule
+        """
+        if len(self.parameter("days_schedules").value) == 1:
+            return self.parameter("days_schedules").component[0].get_values(dates)
+        else:
+            indexes = np.array([date.weekday() for date in dates], dtype=int)
+            values = np.zeros(len(dates))
+            for index in np.unique(indexes):
+                mask = indexes == index
+                values[mask] = self.parameter(
+                    "days_schedules").component[index].get_values(dates[mask])
+            return values
@@ -1,4 +1,5 @@
 import datetime as dt
+import numpy as np
 from bisect import bisect
 from OpenSimula.Parameters import Parameter_component_list, Parameter_string_list
 from OpenSimula.Component import Component
@@ -18,7 +19,7 @@ class Year_schedule(Component):
             )
         )
         # Create Variable
-        self.add_variable(Variable("values", ""))
+        self.add_variable(Variable("values", "", pre_calculated=True))
 
     def check(self):
         errors = super().check()
@@ -53,13 +54,34 @@ class Year_schedule(Component):
             datetime = dt.datetime.strptime(period, "%d/%m")
             self._periods_days_.append(datetime.timetuple().tm_yday)
 
-    def pre_iteration(self, time_index, date, daylight_saving):
-        super().pre_iteration(time_index, date, daylight_saving)
-        if daylight_saving:  # adding 1 h
-            date = date + dt.timedelta(0, 3600)
-        self.variable("values").values[time_index] = self.get_value(date)
+    def pre_calculation(self, dates, daylight_saving):
+        super().pre_calculation(dates, daylight_saving)
+        dates = dates.copy()
+        dates[daylight_saving] = dates[daylight_saving] + \
+            dt.timedelta(0, 3600)  # adding 1 h
+        self.variable("values").values = self.get_values(dates)
+        self.pre_calculated = True
 
     def get_value(self, date):
         year_day = date.timetuple().tm_yday
         index = bisect(self._periods_days_, year_day)
         return self.parameter("weeks_schedules").component[index].get_value(date)
+
+    def get_values(self, dates):
+        """Values of the schedule for an array of dates
+
+        Args:
+            dates (datetime array): dates
+
+        Returns:
+            numpy array: values of the schedule
+        """
+        year_days = np.array([date.timetuple().tm_yday for date in dates])
+        indexes = np.searchsorted(
+            self._periods_days_, year_days, side="right")
+        values = np.zeros(len(dates))
+        for index in np.unique(indexes):
+            mask = indexes == index
+            values[mask] = self.parameter(
+                "weeks_schedules").component[index].get_values(dates[mask])
+        return values
@@ -0,0 +1,229 @@
+import numpy as np
+
+# Vectorized version of the psychrolib functions used by OpenSimula (SI units)
+# Same equations and tolerances as psychrolib, ASHRAE Handbook - Fundamentals (2017) ch. 1
+
+TRIPLE_POINT_WATER = 0.01
+FREEZING_POINT_WATER = 0.0
+MIN_HUM_RATIO = 1e-7
+TOLERANCE = 0.001
+MAX_ITER_COUNT = 100
+
+
+def sat_vap_pres(T):
+    """Saturation vapor pressure
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+
+    Returns:
+        numpy array: Vapor pressure of saturated air (Pa)
+    """
+    T = np.asarray(T, dtype=float)
+    if np.any(T < -100) or np.any(T > 200):
+        raise ValueError("Dry bulb temperature must be in range [-100, 200]°C")
+    T_K = T + 273.15
+    ln_pws = np.where(T <= TRIPLE_POINT_WATER,
+                      -5.6745359E+03 / T_K + 6.3925247 - 9.677843E-03 * T_K + 6.2215701E-07 * T_K**2
+                      + 2.0747825E-09 * T_K**3 - 9.484024E-13 *
+                      T_K**4 + 4.1635019 * np.log(T_K),
+                      -5.8002206E+03 / T_K + 1.3914993 - 4.8640239E-02 * T_K + 4.1764768E-05 * T_K**2
+                      - 1.4452093E-08 * T_K**3 + 6.5459673 * np.log(T_K))
+    return np.exp(ln_pws)
+
+
+def _d_ln_pws_(T):
+    T_K = T + 273.15
+    return np.where(T <= TRIPLE_POINT_WATER,
+                    5.6745359E+03 / T_K**2 - 9.677843E-03 + 2 * 6.2215701E-07 * T_K
+                    + 3 * 2.0747825E-09 * T_K**2 - 4 *
+                    9.484024E-13 * T_K**3 + 4.1635019 / T_K,
+                    5.8002206E+03 / T_K**2 - 4.8640239E-02 + 2 * 4.1764768E-05 * T_K
+                    - 3 * 1.4452093E-08 * T_K**2 + 6.5459673 / T_K)
+
+
+def _check_rel_hum_(RH):
+    if np.any(RH < 0) or np.any(RH > 1):
+        raise ValueError("Relative humidity is outside range [0, 1]")
+
+
+def hum_ratio_from_vap_pres(vap_pres, p):
+    """Humidity ratio from water vapor pressure
+
+    Args:
+        vap_pres (numpy array): Partial pressure of water vapor (Pa)
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Humidity ratio (kg/kg)
+    """
+    return np.maximum(0.621945 * vap_pres / (p - vap_pres), MIN_HUM_RATIO)
+
+
+def vap_pres_from_hum_ratio(W, p):
+    """Water vapor pressure from humidity ratio
+
+    Args:
+        W (numpy array): Humidity ratio (kg/kg)
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Partial pressure of water vapor (Pa)
+    """
+    W = np.maximum(W, MIN_HUM_RATIO)
+    return p * W / (0.621945 + W)
+
+
+def sat_hum_ratio(T, p):
+    """Humidity ratio of saturated air
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Humidity ratio of saturated air (kg/kg)
+    """
+    sat_pres = sat_vap_pres(T)
+    return np.maximum(0.621945 * sat_pres / (p - sat_pres), MIN_HUM_RATIO)
+
+
+def hum_ratio_from_rel_hum(T, RH, p):
+    """Humidity ratio from relative humidity
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        RH (numpy array): Relative humidity in range [0, 1]
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Humidity ratio (kg/kg)
+    """
+    _check_rel_hum_(RH)
+    return hum_ratio_from_vap_pres(RH * sat_vap_pres(T), p)
+
+
+def t_dew_point_from_vap_pres(T, vap_pres):
+    """Dew-point temperature from vapor pressure, Newton-Raphson on the logarithm of the
+    vapor pressure as psychrolib, each element stops at its own convergence
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        vap_pres (numpy array): Partial pressure of water vapor (Pa)
+
+    Returns:
+        numpy array: Dew-point temperature (°C)
+    """
+    BOUNDS = [-100, 200]
+    T = np.asarray(T, dtype=float)
+    vap_pres = np.broadcast_to(vap_pres, T.shape)
+    if np.any(vap_pres < sat_vap_pres(BOUNDS[0])) or np.any(vap_pres > sat_vap_pres(BOUNDS[1])):
+        raise ValueError(
+            "Partial pressure of water vapor is outside range of validity of equations")
+    T_dp = T.copy()
+    ln_vp = np.log(vap_pres)
+    active = np.full(T.shape, True)
+    index = 1
+    while np.any(active):
+        T_iter = T_dp[active]
+        ln_vp_iter = np.log(sat_vap_pres(T_iter))
+        T_new = T_iter - (ln_vp_iter - ln_vp[active]) / _d_ln_pws_(T_iter)
+        T_new = np.minimum(np.maximum(T_new, BOUNDS[0]), BOUNDS[1])
+        T_dp[active] = T_new
+        converged = np.fabs(T_new - T_iter) <= TOLERANCE
+        if index > MAX_ITER_COUNT and not np.all(converged):
+            raise ValueError(
+                "Convergence not reached in t_dew_point_from_vap_pres. Stopping.")
+        active[np.flatnonzero(active)[converged]] = False
+        index = index + 1
+    return np.minimum(T_dp, T)
+
+
+def t_dew_point_from_rel_hum(T, RH):
+    """Dew-point temperature from relative humidity
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        RH (numpy array): Relative humidity in range [0, 1]
+
+    Returns:
+        numpy array: Dew-point temperature (°C)
+    """
+    _check_rel_hum_(RH)
+    return t_dew_point_from_vap_pres(T, RH * sat_vap_pres(T))
+
+
+def hum_ratio_from_t_wet_bulb(T, T_wb, p):
+    """Humidity ratio from wet-bulb temperature
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        T_wb (numpy array): Wet-bulb temperature (°C)
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Humidity ratio (kg/kg)
+    """
+    if np.any(T_wb > T):
+        raise ValueError("Wet bulb temperature is above dry bulb temperature")
+    W_s = sat_hum_ratio(T_wb, p)
+    W = np.where(T_wb >= FREEZING_POINT_WATER,
+                 ((2501. - 2.326 * T_wb) * W_s - 1.006 * (T - T_wb)) /
+                 (2501. + 1.86 * T - 4.186 * T_wb),
+                 ((2830. - 0.24 * T_wb) * W_s - 1.006 * (T - T_wb)) /
+                 (2830. + 1.86 * T - 2.1 * T_wb))
+    return np.maximum(W, MIN_HUM_RATIO)
+
+
+def t_wet_bulb_from_hum_ratio(T, W, p):
+    """Wet-bulb temperature from humidity ratio, bisection between dew point and dry bulb
+    temperatures as psychrolib, all the elements are bisected at the same time
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        W (numpy array): Humidity ratio (kg/kg)
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Wet-bulb temperature (°C)
+    """
+    if np.any(W < 0):
+        raise ValueError("Humidity ratio cannot be negative")
+    T = np.asarray(T, dtype=float)
+    W = np.broadcast_to(np.maximum(W, MIN_HUM_RATIO), T.shape)
+    p = np.broadcast_to(p, T.shape)
+    T_sup = T.copy()
+    T_inf = t_dew_point_from_vap_pres(T, vap_pres_from_hum_ratio(W, p))
+    T_wb = (T_inf + T_sup) / 2
+    active = (T_sup - T_inf) > TOLERANCE
+    index = 1
+    while np.any(active):
+        W_star = hum_ratio_from_t_wet_bulb(T[active], T_wb[active], p[active])
+        upper = W_star > W[active]
+        sup = T_sup[active]
+        inf = T_inf[active]
+        sup[upper] = T_wb[active][upper]
+        inf[~upper] = T_wb[active][~upper]
+        T_sup[active] = sup
+        T_inf[active] = inf
+        T_wb[active] = (sup + inf) / 2
+        if index >= MAX_ITER_COUNT:
+            raise ValueError(
+                "Convergence not reached in t_wet_bulb_from_hum_ratio. Stopping.")
+        active = (T_sup - T_inf) > TOLERANCE
+        index = index + 1
+    return T_wb
+
+
+def t_wet_bulb_from_rel_hum(T, RH, p):
+    """Wet-bulb temperature from relative humidity
+
+    Args:
+        T (numpy array): Dry-bulb temperature (°C)
+        RH (numpy array): Relative humidity in range [0, 1]
+        p (numpy array): Atmospheric pressure (Pa)
+
+    Returns:
+        numpy array: Wet-bulb temperature (°C)
+    """
+    return t_wet_bulb_from_hum_ratio(T, hum_ratio_from_rel_hum(T, RH, p), p)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+
+def sunpos(dates, latitude, longitude, timezone):
+    """Solar position for an array of dates
+
+    Args:
+        dates (datetime array): local standard time dates
+        latitude (float): latitude in degrees
+        longitude (float): longitude in degrees
+        timezone (float): time zone in hours
+
+    Returns:
+        (numpy array, numpy array, numpy array): azimuth (South: 0, East: 90) and altitude
+        in degrees and solar hour, rounded to 3 decimals
+    """
+    # Extract the passed data
+    index = pd.DatetimeIndex(dates)
+    year = index.year.to_numpy(dtype=np.int64)
+    month = index.month.to_numpy(dtype=np.int64)
+    day = index.day.to_numpy(dtype=np.int64)
+    hour = index.hour.to_numpy(dtype=np.int64)
+    minute = index.minute.to_numpy(dtype=np.int64)
+    second = index.second.to_numpy(dtype=np.int64)
+    # Math typing shortcuts
+    rad, deg = np.radians, np.degrees
+    sin, cos, tan = np.sin, np.cos, np.tan
+    asin, atan2 = np.arcsin, np.arctan2
+    # Convert latitude and longitude to radians
+    rlat = rad(latitude)
+    rlon = rad(longitude)
+    # Decimal hour of the day at Greenwich
+    greenwichtime = hour - timezone + minute / 60 + second / 3600
+    # Days from J2000, accurate from 1901 to 2099
+    daynum = (
+        367 * year
+        - 7 * (year + (month + 9) // 12) // 4
+        + 275 * month // 9
+        + day
+        - 730531.5
+        + greenwichtime / 24
+    )
+    # Mean longitude of the sun
+    mean_long = daynum * 0.01720279239 + 4.894967873
+    # Mean anomaly of the Sun
+    mean_anom = daynum * 0.01720197034 + 6.240040768
+    # Ecliptic longitude of the sun
+    eclip_long = (
+        mean_long
+        + 0.03342305518 * sin(mean_anom)
+        + 0.0003490658504 * sin(2 * mean_anom)
+    )
+    # Obliquity of the ecliptic
+    obliquity = 0.4090877234 - 0.000000006981317008 * daynum
+    # Right ascension of the sun
+    rasc = atan2(cos(obliquity) * sin(eclip_long), cos(eclip_long))
+    # Declination of the sun
+    decl = asin(sin(obliquity) * sin(eclip_long))
+    # Local sidereal time
+    sidereal = 4.894961213 + 6.300388099 * daynum + rlon
+    # Hour angle of the sun
+    hour_ang = sidereal - rasc
+    # Local elevation of the sun
+    elevation = asin(sin(decl) * sin(rlat) + cos(decl)
+                     * cos(rlat) * cos(hour_ang))
+    # Local azimuth of the sun
+    azimuth = atan2(
+        -cos(decl) * cos(rlat) * sin(hour_ang),
+        sin(decl) - sin(rlat) * sin(elevation),
+    )
+    # Convert azimuth and elevation to degrees
+    azimuth = np.pi-azimuth  # South: 0, East 90
+    azimuth = _into_range_(deg(azimuth), -180, 180)
+    elevation = _into_range_(deg(elevation), -180, 180)
+    # Refraction correction (optional)
+    targ = rad((elevation + (10.3 / (elevation + 5.11))))
+    elevation += (1.02 / tan(targ)) / 60
+
+    # Solar hour
+    hour_ang = _into_range_(deg(hour_ang), -180, 180)
+    solar_hour = hour_ang/15 + 12
+    # Return azimuth and elevation in degrees
+    return (np.round(azimuth, 3), np.round(elevation, 3), np.round(solar_hour, 3))
+
+
+def _into_range_(x, range_min, range_max):
+    shiftedx = x - range_min
+    delta = range_max - range_min
+    return (((shiftedx % delta) + delta) % delta) + range_min
@@ -0,0 +1,91 @@
+import math
+import datetime as dt
+import pytest
+import OpenSimula as osm
+
+
+@pytest.fixture(scope="session")
+def met_file(tmp_path_factory):
+    # Synthetic one year MET file
+    file_name = tmp_path_factory.mktemp("met") / "synthetic.met"
+    lines = ["synthetic", "37.42 5.9 31 15"]
+    date = dt.datetime(2001, 1, 1)
+    for i in range(8760):
+        d, h = divmod(i, 24)
+        T = 18 + 8 * math.sin(2 * math.pi * (d - 110) / 365) + \
+            6 * math.sin(2 * math.pi * (h - 9) / 24)
+        sun = max(0, math.sin(math.pi * (h - 6) / 12))
+        lines.append(f"{date.month} {date.day} {h + 1} {T:.2f} {T - 12:.2f} {700 * sun:.1f} "
+                     f"{150 * sun:.1f} 0 {60 + 20 * math.sin(2 * math.pi * h / 24):.1f} 2.0 90")
+        if h == 23:
+            date += dt.timedelta(days=1)
+    file_name.write_text("\n".join(lines) + "\n")
+    return str(file_name)
+
+
+@pytest.fixture
+def building_project(met_file):
+    """Function returning a two spaces building project with every kind of surface"""
+    def build(n_time_steps=168, perfect_conditioning=False, **project_parameters):
+        sim = osm.Simulation()
+        sim.console_print = False
+        project = sim.new_project("building")
+        project_dict = {
+            "n_time_steps": n_time_steps, "time_step": 3600, "initial_time": "01/01/2001 00:00:00",
+            "components": [
+                {"type": "File_met", "name": "met", "file_name": met_file},
+                {"type": "Day_schedule", "name": "working_day", "time_steps": [28800, 36000],
+                 "values": [0, 100, 0], "interpolation": "STEP"},
+                {"type": "Week_schedule", "name": "week",
+                    "days_schedules": ["working_day"]},
+                {"type": "Year_schedule", "name": "year", "periods": [],
+                    "weeks_schedules": ["week"]},
+                {"type": "Material", "name": "concrete", "conductivity": 1.95,
+                    "density": 2240, "specific_heat": 900},
+                {"type": "Material", "name": "insulation", "conductivity": 0.025,
+                    "density": 25, "specific_heat": 1000},
+                {"type": "Material", "name": "gypsum", "conductivity": 0.16,
+                    "density": 800, "specific_heat": 1090},
+                {"type": "Construction", "name": "wall", "materials": ["gypsum", "insulation", "concrete"],
+                    "thicknesses": [0.013, 0.05, 0.2]},
+                {"type": "Construction", "name": "floor",
+                    "materials": ["concrete"], "thicknesses": [0.15]},
+                {"type": "Construction", "name": "partition", "materials": ["gypsum", "insulation", "gypsum"],
+                    "thicknesses": [0.013, 0.04, 0.013]},
+                {"type": "Glazing", "name": "glass"},
+                {"type": "Frame", "name": "frame"},
+                {"type": "Opening_type", "name": "window", "glazing": "glass", "frame": "frame",
+                    "glazing_fraction": 0.8, "frame_fraction": 0.2},
+                {"type": "Space_type", "name": "office", "input_variables": ["f = year.values"],
+                 "people_density": "0.1*f/100", "light_density": "10*f/100", "other_gains_density": "4.5",
+                 "infiltration": "0.5", "heating_setpoint": "20", "cooling_setpoint": "25",
+                 "heating_on_off": "1", "cooling_on_off": "1"},
+                {"type": "Building", "name": "building",
+                    "file_met": "met", "azimuth": 10},
+                {"type": "Space", "name": "zone1", "space_type": "office", "building": "building",
+                    "floor_area": 30, "volume": 90, "perfect_conditioning": perfect_conditioning},
+                {"type": "Space", "name": "zone2", "space_type": "office", "building": "building",
+                    "floor_area": 30, "volume": 90, "perfect_conditioning": perfect_conditioning},
+                {"type": "Exterior_surface", "name": "z1_south", "construction": "wall", "space": "zone1",
+                    "ref_point": [0, 0, 0], "width": 6, "height": 3, "azimuth": 0, "altitude": 0},
+                {"type": "Exterior_surface", "name": "z1_roof", "construction": "wall", "space": "zone1",
+                    "ref_point": [0, 0, 3], "width": 6, "height": 5, "azimuth": 0, "altitude": 90},
+                {"type": "Underground_surface", "name": "z1_floor", "construction": "floor", "space": "zone1",
+                    "ref_point": [0, 5, 0], "width": 6, "height": 5, "azimuth": 0, "altitude": -90},
+                {"type": "Opening", "name": "z1_window", "surface": "z1_south", "opening_type": "window",
+                    "ref_point": [1, 1], "width": 2, "height": 1.5, "setback": 0.1},
+                {"type": "Interior_surface", "name": "z1_z2_wall", "construction": "partition",
+                    "spaces": ["zone1", "zone2"], "ref_point": [0, 5, 0], "width": 6, "height": 3,
+                    "azimuth": 180, "altitude": 0},
+                {"type": "Exterior_surface", "name": "z2_north", "construction": "wall", "space": "zone2",
+                    "ref_point": [6, 10, 0], "width": 6, "height": 3, "azimuth": 180, "altitude": 0},
+                {"type": "Virtual_exterior_surface", "name": "z2_west", "space": "zone2",
+                    "ref_point": [0, 10, 0], "width": 5, "height": 3, "azimuth": -90, "altitude": 0},
+                {"type": "Underground_surface", "name": "z2_floor", "construction": "floor", "space": "zone2",
+                    "ref_point": [0, 10, 0], "width": 6, "height": 5, "azimuth": 0, "altitude": -90},
+            ]}
+        project_dict.update(project_parameters)
+        project.read_dict(project_dict)
+        assert project.check() == []
+        return project
+    return build
@@ -0,0 +1,97 @@
+import numpy as np
+from OpenSimula.components.Building import Building
+
+
+def results(project):
+    values = {}
+    for comp in project.component_list():
+        for key, var in comp.variable_dict().items():
+            if var.stored and var.values is not None:
+                values[comp.parameter("name").value +
+                       "." + key] = np.asarray(var.values, dtype=float)
+    return values
+
+
+def test_sparse_matches_dense(building_project, monkeypatch):
+    for perfect_conditioning in [False, True]:
+        dense = building_project(perfect_conditioning=perfect_conditioning)
+        dense.simulate()
+        assert not dense.component("building")._sparse
+        monkeypatch.setattr(Building, "SPARSE_THRESHOLD", 0)
+        sparse = building_project(perfect_conditioning=perfect_conditioning)
+        sparse.simulate()
+        assert sparse.component("building")._sparse
+        monkeypatch.undo()
+        dense_values = results(dense)
+        sparse_values = results(sparse)
+        assert dense_values.keys() == sparse_values.keys()
+        for name, values in dense_values.items():
+            assert np.allclose(sparse_values[name], values, rtol=1e-9, atol=1e-7), name
+
+
+def test_perfect_conditioning_within_setpoints(building_project):
+    project = building_project(n_time_steps=24*14, perfect_conditioning=True)
+    project.simulate()
+    heating = cooling = 0
+    for name in ["zone1", "zone2"]:
+        space = project.component(name)
+        T = space.variable("temperature").values
+        Q_heating = space.variable("Q_heating").values
+        Q_cooling = space.variable("Q_cooling").values
+        assert np.all(T >= 20 - 1e-6) and np.all(T <= 25 + 1e-6)
+        assert np.all(Q_heating >= 0) and np.all(Q_cooling >= 0)
+        # The system only works with the temperature at a setpoint
+        assert np.all(np.abs(T[Q_heating > 1e-6] - 20) < 1e-6)
+        assert np.all(np.abs(T[Q_cooling > 1e-6] - 25) < 1e-6)
+        heating += np.count_nonzero(Q_heating > 1e-6)
+        cooling += np.count_nonzero(Q_cooling > 1e-6)
+    # Both setpoints are reached in the test period
+    assert heating > 0 and cooling > 0
+
+
+def test_simulation_order(building_project):
+    project = building_project()
+    order = project.parameter("simulation_order").value
+    order.remove("Building")
+    order.insert(order.index("Interior_surface"), "Building")
+    project.parameter("simulation_order").value = order
+    errors = project.check()
+    assert len(errors) == 2
+    assert "Interior_surface must be before Building" in errors[0]
+    assert "Opening must be before Building" in errors[1]
+    order.remove("Interior_surface")
+    project.parameter("simulation_order").value = order
+    errors = project.check()
+    assert "Interior_surface must be before Building" in errors[0]
+
+
+def test_perfect_conditioning_not_converged(building_project):
+    project = building_project(perfect_conditioning=True)
+    project.simulate()
+    building = project.component("building")
+    time_index = project.parameter("n_time_steps").value - 1
+    date = project.dates()[time_index]
+    # Strongly coupled spaces: heating zone2 takes zone1 over its cooling setpoint
+    building.KFIN_matrix = np.array([[2.0, -1.9], [-1.9, 2.0]])
+    building.FFIN_vector = building.KFIN_matrix @ np.array([22.0, 15.0])
+
+    def iterate(n_max_iteration):
+        project.parameter("n_max_iteration").value = n_max_iteration
+        building.TZ_vector = np.array([22.0, 15.0])
+        building._settled = None
+        converged = building.iteration(time_index, date, False)
+        # Repeated iterations of the time step do not solve again
+        assert building.iteration(time_index, date, False) == converged
+        return converged, building.TZ_vector.copy()
+
+    for n_max_iteration in [1, 2]:
+        converged, T = iterate(n_max_iteration)
+        assert not converged
+        assert T[1] == 20  # At least one clamp solution
+        assert T[0] > 25
+    assert any("perfect conditioning does not converge" in m
+               for m in project.simulation().message_list())
+    converged, T = iterate(3)
+    assert converged
+    assert np.allclose(T, [25, 20])
+    assert building.variable("n_iterations").values[time_index] == 3
@@ -0,0 +1,65 @@
+import math
+import numpy as np
+import pytest
+import OpenSimula as osm
+from OpenSimula.components.Construction import Conduction_history
+
+DELTA_T = 3600
+
+
+@pytest.fixture
+def constructions():
+    sim = osm.Simulation()
+    sim.console_print = False
+    project = sim.new_project("constructions")
+    project.read_dict({"components": [
+        {"type": "Material", "name": "concrete", "conductivity": 1.95,
+            "density": 2240, "specific_heat": 900},
+        {"type": "Material", "name": "insulation", "conductivity": 0.025,
+            "density": 25, "specific_heat": 1000},
+        {"type": "Material", "name": "gypsum", "conductivity": 0.16,
+            "density": 800, "specific_heat": 1090},
+        {"type": "Construction", "name": "wall", "materials": ["gypsum", "insulation", "concrete"],
+            "thicknesses": [0.013, 0.05, 0.2]},
+        {"type": "Construction", "name": "floor",
+            "materials": ["concrete"], "thicknesses": [0.15]},
+        {"type": "Construction", "name": "partition", "materials": ["gypsum", "insulation", "gypsum"],
+            "thicknesses": [0.013, 0.04, 0.013]},
+    ]})
+    assert project.check() == []
+    result = project.component_list(type="Construction")
+    for construction in result:
+        construction.pre_simulation(10, DELTA_T)
+    return result
+
+
+def test_B_roots(constructions):
+    for construction in constructions:
+        roots = construction._B_roots_(DELTA_T)
+        assert len(roots) > 0
+        assert np.all(np.diff(roots) > 0)
+        assert math.exp(-roots[-1] * DELTA_T) <= 1e-10
+        # Each root is a zero of B
+        for root in roots:
+            B_left = construction._H_Matrix_(root * (1 - 1e-7))[0, 1]
+            B_right = construction._H_Matrix_(root * (1 + 1e-7))[0, 1]
+            assert B_left * B_right <= 0
+        # No root is missed: sign changes of B on a fine grid in sqrt(s)
+        u = np.linspace(1e-9, math.sqrt(roots[-1]) * (1 + 1e-6), 200000)
+        B = construction._H_Matrix_array_(u * u)[:, 0, 1]
+        assert np.count_nonzero(B[:-1] * B[1:] < 0) == len(roots)
+
+
+def test_conduction_history(constructions):
+    T_ini = 20
+    history = Conduction_history(constructions, T_ini)
+    n = 80
+    rng = np.random.default_rng(0)
+    values = rng.normal(20, 5, (n, len(constructions), 4))
+    for t in range(n):
+        P = history.get_P()
+        for i, construction in enumerate(constructions):
+            expected = construction.get_P(t, values[:, i, 0], values[:, i, 1],
+                                          values[:, i, 2], values[:, i, 3], T_ini)
+            assert P[i] == pytest.approx(expected, rel=1e-10, abs=1e-9)
+        history.push(values[t])
@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pytest
+from OpenSimula.Disk_cache import Disk_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENSIMULA_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("OPENSIMULA_CACHE_DISABLE", raising=False)
+    monkeypatch.delenv("OPENSIMULA_CACHE_ENABLE", raising=False)
+    monkeypatch.setattr(Disk_cache, "enabled", True)
+    return tmp_path
+
+
+def test_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENSIMULA_CACHE_DIR", str(tmp_path))
+    monkeypatch.delenv("OPENSIMULA_CACHE_ENABLE", raising=False)
+    cache = Disk_cache("test")
+    assert not cache.active
+    cache.save(cache.key("a"), {"x": np.arange(3)})
+    assert os.listdir(tmp_path) == []
+    monkeypatch.setenv("OPENSIMULA_CACHE_ENABLE", "1")
+    assert cache.active
+
+
+def test_save_load(cache_dir):
+    cache = Disk_cache("test")
+    key = cache.key("a", 1, 2.5)
+    assert cache.load(key) is None
+    arrays = {"x": np.linspace(0, 1, 11), "y": np.array(3.0)}
+    cache.save(key, arrays)
+    data = cache.load(key)
+    assert set(data.keys()) == {"x", "y"}
+    assert np.array_equal(data["x"], arrays["x"])
+    assert data["y"] == 3.0
+    assert cache.key("a", 1, 2.5) == key
+    assert cache.key("a", 1, 2.6) != key
+
+
+def test_file_key_changes_with_contents(cache_dir, tmp_path):
+    cache = Disk_cache("test")
+    file_name = tmp_path / "data.txt"
+    file_name.write_text("1 2 3")
+    key = cache.file_key(str(file_name))
+    stat = os.stat(file_name)
+    file_name.write_text("1 2 4")  # Same size and modification time
+    os.utime(file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.file_key(str(file_name)) != key
+
+
+def test_evict(cache_dir):
+    cache = Disk_cache("test")
+    x = np.zeros(1000)
+    cache.save(cache.key(0), {"x": x})
+    size = os.path.getsize(cache._file_name_(cache.key(0)))
+    os.utime(cache._file_name_(cache.key(0)), ns=(0, 0))
+    cache.max_size = 3 * size
+    for i in range(1, 5):
+        cache.save(cache.key(i), {"x": x})
+        os.utime(cache._file_name_(cache.key(i)),
+                 ns=(i * 10**9, i * 10**9))
+    entries = cache._entries_()
+    assert sum(entry[2] for entry in entries) <= cache.max_size
+    # The most recently used entries are kept
+    assert cache.load(cache.key(4)) is not None
+    assert cache.load(cache.key(0)) is None
+
+
+def test_clear(cache_dir):
+    cache_a = Disk_cache("test_a")
+    cache_b = Disk_cache("test_b")
+    cache_a.save(cache_a.key(1), {"x": np.ones(2)})
+    cache_b.save(cache_b.key(1), {"x": np.ones(2)})
+    cache_a.clear()
+    assert cache_a.load(cache_a.key(1)) is None
+    assert cache_b.load(cache_b.key(1)) is not None
+    cache_a.save(cache_a.key(1), {"x": np.ones(2)})
+    Disk_cache.clear_all()
+    assert cache_a._entries_() == []
+    assert cache_b._entries_() == []
+
+
+def test_environment_disable(cache_dir, monkeypatch):
+    cache = Disk_cache("test")
+    key = cache.key(1)
+    cache.save(key, {"x": np.ones(2)})
+    monkeypatch.setenv("OPENSIMULA_CACHE_DISABLE", "1")
+    assert not cache.active
+    assert cache.load(key) is None
+    cache.save(cache.key(2), {"x": np.ones(2)})
+    monkeypatch.delenv("OPENSIMULA_CACHE_DISABLE")
+    assert cache.load(cache.key(2)) is None
+    assert cache.load(key) is not None
@@ -0,0 +1,34 @@
+import numpy as np
+
+
+def test_dispatch_lists(building_project):
+    project = building_project()
+    project.simulate()
+    pre_iteration = [comp.parameter("name").value
+                     for comp in project._pre_iteration_list_]
+    # Space_type and spaces gains are pre-calculated, nothing to do in pre_iteration
+    assert project.component("office").pre_calculated
+    assert project.component("zone1").pre_calculated
+    assert "office" not in pre_iteration and "zone1" not in pre_iteration
+    assert "building" in pre_iteration
+    post_iteration = [comp.parameter("name").value
+                      for comp in project._post_iteration_list_]
+    assert "zone1" in post_iteration
+
+
+def test_dispatch_lists_not_pre_calculated(building_project):
+    pre_calculated = building_project()
+    pre_calculated.simulate()
+    project = building_project()
+    project.component("office").pre_calculation = lambda dates, daylight_saving: None
+    project.simulate()
+    pre_iteration = [comp.parameter("name").value
+                     for comp in project._pre_iteration_list_]
+    assert not project.component("office").pre_calculated
+    assert not project.component("zone1").pre_calculated
+    assert "office" in pre_iteration and "zone1" in pre_iteration
+    # Same results calculating the gains in each time step
+    for name in ["office", "zone1", "zone2"]:
+        for key, var in project.component(name).variable_dict().items():
+            assert np.allclose(var.values, pre_calculated.component(name).variable(key).values), \
+                name + "." + key
@@ -0,0 +1,62 @@
+import numpy as np
+import psychrolib
+import pytest
+from OpenSimula.components.utils import psychrometrics as psychro
+
+psychrolib.SetUnitSystem(psychrolib.SI)
+
+T_GRID = np.array([-40.0, -20.0, -5.0, -0.5, 0.0, 0.005, 0.01,
+                  0.5, 5.0, 15.0, 25.0, 35.0, 45.0])
+RH_GRID = np.array([0.0, 0.01, 0.2, 0.5, 0.8, 0.99, 1.0])
+P_GRID = np.array([80000.0, 101325.0])
+
+
+def grid():
+    T, RH, p = np.meshgrid(T_GRID, RH_GRID, P_GRID, indexing="ij")
+    return T.ravel(), RH.ravel(), p.ravel()
+
+
+def test_sat_vap_pres():
+    expected = [psychrolib.GetSatVapPres(T) for T in T_GRID]
+    assert np.allclose(psychro.sat_vap_pres(T_GRID), expected, rtol=1e-12)
+
+
+def test_hum_ratio_from_rel_hum():
+    T, RH, p = grid()
+    expected = [psychrolib.GetHumRatioFromRelHum(T[i], RH[i], p[i])
+                for i in range(len(T))]
+    assert np.allclose(psychro.hum_ratio_from_rel_hum(
+        T, RH, p), expected, rtol=1e-12, atol=0)
+
+
+def test_t_dew_point_from_rel_hum():
+    T, RH, p = grid()
+    wet = RH > 0
+    T, RH = T[wet], RH[wet]
+    expected = [psychrolib.GetTDewPointFromRelHum(
+        T[i], RH[i]) for i in range(len(T))]
+    assert np.allclose(psychro.t_dew_point_from_rel_hum(
+        T, RH), expected, rtol=0, atol=1e-9)
+
+
+def test_t_dew_point_dry_air_raises():
+    # Vapor pressure 0 is outside the range of the equations, as in psychrolib
+    with pytest.raises(ValueError):
+        psychrolib.GetTDewPointFromRelHum(20.0, 0.0)
+    with pytest.raises(ValueError):
+        psychro.t_dew_point_from_rel_hum(np.array([20.0]), np.array([0.0]))
+
+
+def test_t_wet_bulb_from_hum_ratio():
+    T, RH, p = grid()  # RH = 0 included, minimum humidity ratio
+    W = psychro.hum_ratio_from_rel_hum(T, RH, p)
+    expected = [psychrolib.GetTWetBulbFromHumRatio(
+        T[i], W[i], p[i]) for i in range(len(T))]
+    assert np.allclose(psychro.t_wet_bulb_from_hum_ratio(
+        T, W, p), expected, rtol=0, atol=1e-9)
+
+
+def test_rel_hum_out_of_range():
+    with pytest.raises(ValueError):
+        psychro.hum_ratio_from_rel_hum(
+            np.array([20.0]), np.array([1.1]), np.array([101325.0]))
@@ -0,0 +1,58 @@
+import math
+import datetime as dt
+import numpy as np
+from OpenSimula.components.utils.sun_position import sunpos
+
+
+def scalar_sunpos(date, latitude, longitude, timezone):
+    # Scalar algorithm used by File_met before the vectorized version
+    rad, deg = math.radians, math.degrees
+    sin, cos, tan = math.sin, math.cos, math.tan
+    asin, atan2 = math.asin, math.atan2
+    rlat = rad(latitude)
+    rlon = rad(longitude)
+    greenwichtime = date.hour - timezone + date.minute / 60 + date.second / 3600
+    daynum = (367 * date.year - 7 * (date.year + (date.month + 9) // 12) // 4
+              + 275 * date.month // 9 + date.day - 730531.5 + greenwichtime / 24)
+    mean_long = daynum * 0.01720279239 + 4.894967873
+    mean_anom = daynum * 0.01720197034 + 6.240040768
+    eclip_long = (mean_long + 0.03342305518 * sin(mean_anom)
+                  + 0.0003490658504 * sin(2 * mean_anom))
+    obliquity = 0.4090877234 - 0.000000006981317008 * daynum
+    rasc = atan2(cos(obliquity) * sin(eclip_long), cos(eclip_long))
+    decl = asin(sin(obliquity) * sin(eclip_long))
+    sidereal = 4.894961213 + 6.300388099 * daynum + rlon
+    hour_ang = sidereal - rasc
+    elevation = asin(sin(decl) * sin(rlat) + cos(decl)
+                     * cos(rlat) * cos(hour_ang))
+    azimuth = atan2(-cos(decl) * cos(rlat) * sin(hour_ang),
+                    sin(decl) - sin(rlat) * sin(elevation))
+    azimuth = into_range(deg(math.pi - azimuth), -180, 180)
+    elevation = into_range(deg(elevation), -180, 180)
+    targ = rad((elevation + (10.3 / (elevation + 5.11))))
+    elevation += (1.02 / tan(targ)) / 60
+    hour_ang = into_range(deg(hour_ang), -180, 180)
+    solar_hour = hour_ang/15 + 12
+    return (round(azimuth, 3), round(elevation, 3), round(solar_hour, 3))
+
+
+def into_range(x, range_min, range_max):
+    shiftedx = x - range_min
+    delta = range_max - range_min
+    return (((shiftedx % delta) + delta) % delta) + range_min
+
+
+def test_sunpos_matches_scalar():
+    start = dt.datetime(2001, 1, 1, 0, 30)
+    dates = np.array([start + dt.timedelta(minutes=37 * i)
+                     for i in range(15000)])
+    for latitude, longitude, timezone in [(37.4, -6.0, 1), (-33.9, 151.2, 10), (64.1, -21.9, 0)]:
+        azi, alt, hour = sunpos(dates, latitude, longitude, timezone)
+        for i in range(0, len(dates), 7):
+            expected = scalar_sunpos(dates[i], latitude, longitude, timezone)
+            # Rounded to 3 decimals, allow one unit in the last place
+            assert abs(azi[i] - expected[0]) <= 1.0001e-3 or \
+                abs(abs(azi[i] - expected[0]) - 360) <= 1.0001e-3
+            assert abs(alt[i] - expected[1]) <= 1.0001e-3
+            assert abs(hour[i] - expected[2]) <= 1.0001e-3 or \
+                abs(abs(hour[i] - expected[2]) - 24) <= 1.0001e-3
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+def test_output_variables(building_project):
+    full = building_project()
+    full.simulate()
+    project = building_project(output_variables=[
+                               "Space.temperature", "z1_*.T_s0", "building.*"])
+    project.simulate()
+    n = project.parameter("n_time_steps").value
+    stored = {"zone1.temperature", "zone2.temperature", "z1_south.T_s0", "z1_roof.T_s0",
+              "z1_floor.T_s0", "z1_window.T_s0", "z1_z2_wall.T_s0", "building.n_iterations"}
+    store = project.variable_store()
+    for comp in project.component_list():
+        if not comp.store_variables:
+            continue
+        name = comp.parameter("name").value
+        for key, var in comp.variable_dict().items():
+            if name + "." + key in stored or var.pre_calculated:
+                assert var.stored and len(var.values) == n
+                assert store.location(var) is not None
+                full_values = full.component(name).variable(key).values
+                assert np.array_equal(var.values, full_values), name + "." + key
+            else:
+                assert not var.stored, name + "." + key
+    block, names = store.block("Space")
+    assert "zone1.temperature" in names and "zone1.Q_heating" not in names
+    assert block.shape[0] == n
+
+
+def test_result_dtype(building_project):
+    full = building_project()
+    full.simulate()
+    project = building_project(result_dtype="float32")
+    project.simulate()
+    store = project.variable_store()
+    assert store.block("Space")[0].dtype == np.float32
+    assert store.block("Space_state")[0].dtype == np.float64
+    for comp in project.component_list():
+        if not comp.store_variables:
+            continue
+        name = comp.parameter("name").value
+        for key, var in comp.variable_dict().items():
+            expected = np.float64 if var.state else np.float32
+            assert var.values.dtype == expected, name + "." + key
+            full_values = full.component(name).variable(key).values
+            assert np.allclose(var.values, full_values, rtol=1e-5, atol=1e-3), name + "." + key